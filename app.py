@@ -2,7 +2,8 @@
 import importlib
 import streamlit as st
 
-from utils import load_data
+from datastore import load_manifest
+from utils import refresh_changed_data
 from pages import PAGE_MODULES
 
 # Pages disponibles (nom affiché)
@@ -35,16 +36,13 @@ st.markdown(
 
 
 def get_years_for_filters():
-    """Années disponibles pour les filtres (à partir d’une source commune)."""
+    """Années disponibles pour les filtres (lues dans les manifestes des jeux de données)."""
     all_years = set()
     for _name, path in DATA_PATHS.items():
         if not path:
             continue
         try:
-            df = load_data(path)
-            year_col = "ANNEE" if "ANNEE" in df.columns else ("year" if "year" in df.columns else None)
-            if year_col is not None:
-                all_years.update(df[year_col].astype(int).dropna().unique().tolist())
+            all_years.update(load_manifest(path)["years"])
         except Exception:
             pass
     if not all_years:
@@ -61,55 +59,81 @@ def pick_value_cols(hosp: str):
 
 
 # ---------------------------
-# Sidebar : page + filtres (commun à toutes les pages)
+# Données : fichiers régénérés depuis le dernier passage -> rechargement du seul domaine concerné
+# ---------------------------
+refresh_changed_data(DATA_PATHS.values())
+
+# ---------------------------
+# Sidebar : page (un changement de page réexécute toute l'app) + filtres, dessinés par le fragment
 # ---------------------------
 st.sidebar.header("Navigation")
 page_choice = st.sidebar.selectbox("Page", options=PAGES, label_visibility="collapsed")
 
 years = get_years_for_filters()
 st.sidebar.header("Filtres")
-show_forecast = st.sidebar.checkbox("Afficher prévision 2017", value=False)
-# 2017 n’apparaît dans la liste qu’une fois la prévision activée
-years_for_select = [y for y in years if y != 2017 or show_forecast]
-year_choice = st.sidebar.selectbox("Année", options=["Toutes"] + years_for_select)
-mode_choice = st.sidebar.radio(
-    "Mode",
-    options=["Normal", "Crise"],
-    index=0,
-    format_func=lambda x: {
-        "Normal": "Situation normale",
-        "Crise": "Crise sanitaire (simulation)",
-    }[x],
-)
-hospital_choice = st.sidebar.radio(
-    "Site / Total",
-    options=["TOTAL", "PLF", "CFX"],
-    format_func=lambda x: {"TOTAL": "Total (PSL + CFX)", "PLF": "Pitié-Salpêtrière (PSL)", "CFX": "Charles Foix (CFX)"}[x],
-)
-
-normal_col, crise_col = pick_value_cols(hospital_choice)
 
 # ---------------------------
-# En-tête commun : titre + mode affiché
+# En-tête commun : titre
 # ---------------------------
 st.title(f"Infographie {page_choice} PSL–CFX")
-st.caption(f"Mode affiché : **{mode_choice}**")
 
-# ---------------------------
-# Contenu : délégation au module de la page
-# ---------------------------
 module_name = PAGE_MODULES[page_choice]
 page_module = importlib.import_module(f"pages.{module_name}")
 
-context = {
-    "data_path": DATA_PATHS.get(page_choice),
-    "year_choice": year_choice,
-    "mode_choice": mode_choice,
-    "hospital_choice": hospital_choice,
-    "normal_col": normal_col,
-    "crise_col": crise_col,
-    "years": years,
-    "page_name": page_choice,
-    "show_forecast": show_forecast,
-}
-page_module.render(st, **context)
+
+@st.fragment
+def page_content():
+    """
+    Filtres de la sidebar (prévision, année, mode, site, regroupement) + contenu de la page.
+
+    Dans un fragment : changer un filtre (ou d'indicateur dans la page) ne réexécute que cette
+    partie, pas la navigation ni le reste de l'app. Les widgets restent dans la sidebar : le
+    fragment y écrit sous l'en-tête « Filtres » et seul le fragment est réexécuté.
+    """
+    show_forecast = st.sidebar.checkbox("Afficher prévision 2017", value=False)
+    # 2017 n’apparaît dans la liste qu’une fois la prévision activée
+    years_for_select = [y for y in years if y != 2017 or show_forecast]
+    year_choice = st.sidebar.selectbox("Année", options=["Toutes"] + years_for_select)
+    mode_choice = st.sidebar.radio(
+        "Mode",
+        options=["Normal", "Crise"],
+        index=0,
+        format_func=lambda x: {
+            "Normal": "Situation normale",
+            "Crise": "Crise sanitaire (simulation)",
+        }[x],
+    )
+    hospital_choice = st.sidebar.radio(
+        "Site / Total",
+        options=["TOTAL", "PLF", "CFX"],
+        format_func=lambda x: {"TOTAL": "Total (PSL + CFX)", "PLF": "Pitié-Salpêtrière (PSL)", "CFX": "Charles Foix (CFX)"}[x],
+    )
+
+    facet_charts = st.sidebar.checkbox(
+        "Graphiques regroupés par unité",
+        value=False,
+        help="Un seul graphique en petits multiples par unité au lieu d'un graphique par sous-indicateur.",
+    )
+
+    normal_col, crise_col = pick_value_cols(hospital_choice)
+
+    # Mode affiché
+    st.caption(f"Mode affiché : **{mode_choice}**")
+
+    # Contenu : délégation au module de la page
+    context = {
+        "data_path": DATA_PATHS.get(page_choice),
+        "year_choice": year_choice,
+        "mode_choice": mode_choice,
+        "hospital_choice": hospital_choice,
+        "normal_col": normal_col,
+        "crise_col": crise_col,
+        "years": years,
+        "page_name": page_choice,
+        "show_forecast": show_forecast,
+        "facet_charts": facet_charts,
+    }
+    page_module.render(st, **context)
+
+
+page_content()
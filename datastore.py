@@ -0,0 +1,232 @@
+# datastore.py — stockage colonnaire (Parquet) des jeux de données data/<domaine>/*.csv
+"""
+Conversion des CSV de data/<domaine>/ en fichiers Parquet typés :
+- colonnes libellés (indicateur, sous_indicateur, unite, site_code...) encodées en dictionnaire
+- year / month / ANNEE en entiers compacts
+
+L'application lit le fichier .parquet à la place du CSV dès qu'il existe et qu'il est
+à jour (voir read_dataset). python -m pipeline et python -m forecasting le reconstruisent
+après chaque CSV réécrit (voir refresh_columnar).
+
+Chaque jeu de données a aussi un manifeste (<nom>.manifest.json) : années, sites,
+indicateurs, nombre de lignes et empreinte du contenu. La sidebar le lit au lieu de
+charger les données ; il est reconstruit automatiquement quand le CSV change.
+
+Usage :
+    python datastore.py              # convertit tous les CSV de data/
+    python datastore.py data/hr      # convertit un seul domaine (ou un seul fichier)
+"""
+
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+
+import pandas as pd
+
+
+DATA_DIR = "data"
+
+# Colonnes libellés -> dtype "category" (dictionnaire dans le Parquet)
+LABEL_COLUMNS = (
+    "site_code",
+    "indicateur",
+    "sous_indicateur",
+    "unite",
+    "INDICATEUR",
+    "SOUS-INDICATEUR",
+    "UNITE",
+    "MODE",
+)
+
+# Colonnes temporelles -> entiers compacts
+INT_COLUMNS = {
+    "year": "int16",
+    "month": "int8",
+    "ANNEE": "int16",
+}
+
+
+def has_parquet_engine() -> bool:
+    """Vrai si pyarrow est installé (nécessaire pour lire / écrire le Parquet)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def columnar_path(csv_path: str) -> str:
+    """Chemin du fichier Parquet associé à un CSV (même nom, extension .parquet)."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convertit les libellés en category et les colonnes temporelles en entiers compacts."""
+    for col in LABEL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col, dtype in INT_COLUMNS.items():
+        # Colonne incomplète (NaN) : on la laisse telle quelle plutôt que d'inventer une valeur
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_csv_typed(csv_path: str) -> pd.DataFrame:
+    """Lecture CSV avec les mêmes types que le Parquet (repli quand il n'existe pas)."""
+    df = pd.read_csv(csv_path, dtype={col: "category" for col in LABEL_COLUMNS})
+    return optimize_dtypes(df)
+
+
+def is_columnar_fresh(csv_path: str) -> bool:
+    """Vrai si le Parquet existe et n'est pas plus ancien que le CSV source."""
+    pq_path = columnar_path(csv_path)
+    if not os.path.exists(pq_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(pq_path) >= os.path.getmtime(csv_path)
+
+
+def read_dataset(csv_path: str) -> pd.DataFrame:
+    """
+    Charge un jeu de données : Parquet si disponible et à jour, sinon CSV typé.
+
+    Args:
+        csv_path: chemin du CSV de référence (ex: data/hr/hr-all.csv)
+
+    Returns:
+        DataFrame avec libellés en category et year / month en entiers
+    """
+    if has_parquet_engine() and is_columnar_fresh(csv_path):
+        return optimize_dtypes(pd.read_parquet(columnar_path(csv_path)))
+    return read_csv_typed(csv_path)
+
+
+def convert_csv(csv_path: str) -> str:
+    """Construit le Parquet d'un CSV et retourne son chemin."""
+    df = read_csv_typed(csv_path)
+    pq_path = columnar_path(csv_path)
+    df.to_parquet(pq_path, engine="pyarrow", index=False, compression="zstd")
+    return pq_path
+
+
+def refresh_columnar(csv_path: str):
+    """
+    Reconstruit le Parquet d'un CSV qui vient d'être réécrit (pipeline, prévisions), pour que
+    le dashboard ne retombe pas sur la lecture du CSV.
+
+    Returns:
+        chemin du Parquet écrit, None sans pyarrow (le dashboard lit alors le CSV)
+    """
+    if not has_parquet_engine():
+        return None
+    return convert_csv(csv_path)
+
+
+# --- Manifeste ---
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def manifest_path(csv_path: str) -> str:
+    """Chemin du manifeste associé à un CSV."""
+    return os.path.splitext(csv_path)[0] + MANIFEST_SUFFIX
+
+
+def file_signature(path: str) -> dict:
+    """Signature rapide d'un fichier (taille + date de modification)."""
+    st_ = os.stat(path)
+    return {"size": st_.st_size, "mtime_ns": st_.st_mtime_ns}
+
+
+def content_fingerprint(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _sorted_labels(df: pd.DataFrame, col: str) -> list:
+    if col not in df.columns:
+        return []
+    return sorted(str(v) for v in df[col].dropna().unique().tolist())
+
+
+def build_manifest(csv_path: str) -> dict:
+    """Calcule le manifeste d'un jeu de données et l'écrit à côté du CSV."""
+    df = read_dataset(csv_path)
+    year_col = "ANNEE" if "ANNEE" in df.columns else ("year" if "year" in df.columns else None)
+    years = sorted(int(y) for y in df[year_col].dropna().unique().tolist()) if year_col else []
+    manifest = {
+        "source": csv_path,
+        "signature": file_signature(csv_path),
+        "fingerprint": content_fingerprint(csv_path),
+        "rows": int(len(df)),
+        "years": years,
+        "sites": _sorted_labels(df, "site_code"),
+        "indicateurs": _sorted_labels(df, "indicateur" if "indicateur" in df.columns else "INDICATEUR"),
+    }
+    _write_manifest(csv_path, manifest)
+    return manifest
+
+
+def _write_manifest(csv_path: str, manifest: dict) -> None:
+    # Dossier en lecture seule : le manifeste reste valable en mémoire
+    try:
+        with open(manifest_path(csv_path), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+    except OSError:
+        pass
+
+
+def load_manifest(csv_path: str) -> dict:
+    """
+    Manifeste d'un jeu de données, reconstruit si le CSV source a changé.
+
+    La signature (taille, mtime) est comparée d'abord ; si elle diffère mais que
+    l'empreinte du contenu est identique (fichier simplement touché), seule la
+    signature est mise à jour.
+    """
+    signature = file_signature(csv_path)
+    try:
+        with open(manifest_path(csv_path), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return build_manifest(csv_path)
+    if manifest.get("signature") == signature:
+        return manifest
+    if manifest.get("fingerprint") == content_fingerprint(csv_path):
+        manifest["signature"] = signature
+        _write_manifest(csv_path, manifest)
+        return manifest
+    return build_manifest(csv_path)
+
+
+def list_csv_files(target: str = DATA_DIR) -> list:
+    """CSV à convertir : un fichier, un dossier de domaine ou toute l'arborescence data/."""
+    if os.path.isfile(target):
+        return [target]
+    files = glob.glob(os.path.join(target, "*.csv")) + glob.glob(os.path.join(target, "*", "*.csv"))
+    return sorted(set(files))
+
+
+def convert_all(target: str = DATA_DIR) -> list:
+    """Convertit tous les CSV de `target` ; retourne la liste des Parquet écrits."""
+    if not has_parquet_engine():
+        raise RuntimeError("pyarrow est requis pour écrire le Parquet : pip install pyarrow")
+    written = []
+    for csv_path in list_csv_files(target):
+        pq_path = convert_csv(csv_path)
+        csv_size = os.path.getsize(csv_path)
+        pq_size = os.path.getsize(pq_path)
+        print(f"{csv_path} -> {pq_path} ({csv_size / 1024:.0f} Ko -> {pq_size / 1024:.0f} Ko)")
+        written.append(pq_path)
+    return written
+
+
+if __name__ == "__main__":
+    targets = sys.argv[1:] or [DATA_DIR]
+    for target in targets:
+        convert_all(target)
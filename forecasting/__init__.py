@@ -0,0 +1 @@
+# forecasting — prévisions SARIMA en lot pour tous les domaines (voir python -m forecasting --help)
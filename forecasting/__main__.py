@@ -0,0 +1,59 @@
+# forecasting/__main__.py — ligne de commande : python -m forecasting --domain all --year 2017
+import argparse
+
+from forecasting.batch import DOMAINS, METHOD_CHOICES, run
+from forecasting.deadline import SERIES_TIMEOUT
+from forecasting.fastpath import SARIMA_THRESHOLD
+from forecasting.store import STORE_DIR
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m forecasting",
+        description="Prévisions SARIMA de toutes les séries mensuelles, en parallèle.",
+    )
+    parser.add_argument("--domain", nargs="+", default=["all"], choices=["all", *DOMAINS],
+                        help="domaine(s) à prévoir (défaut : all)")
+    parser.add_argument("--year", type=int, default=2017, help="année à prévoir (défaut : 2017)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus (défaut : nombre de cœurs ; 1 = séquentiel)")
+    parser.add_argument("--merge", action="store_true",
+                        help="réécrit aussi <domaine>-all.csv (historique + prévisions)")
+    parser.add_argument("--method", default="auto", choices=METHOD_CHOICES,
+                        help="auto : méthodes rapides quand elles suffisent, SARIMA sinon (défaut) ; "
+                             "sarima : SARIMA pour toutes les séries ; fast : jamais de SARIMA. "
+                             "Calcul des notebooks : --method sarima --crise separate")
+    parser.add_argument("--threshold", type=float, default=SARIMA_THRESHOLD,
+                        help=f"MASE holdout au-delà duquel une série passe en SARIMA (défaut : {SARIMA_THRESHOLD})")
+    parser.add_argument("--crise", default="joint", choices=["joint", "separate"],
+                        help="joint : value_crise déduite de value par le profil mensuel du ratio (défaut) ; "
+                             "separate : second modèle SARIMA comme les notebooks")
+    parser.add_argument("--order-search", action="store_true",
+                        help="choisit les ordres SARIMA par série (grille bornée, arrêt au plateau d'AIC) ; "
+                             "colonne order dans les prévisions")
+    parser.add_argument("--series-timeout", type=float, default=SERIES_TIMEOUT,
+                        help=f"durée maximale d'un ajustement SARIMA en secondes, 0 = sans limite "
+                             f"(défaut : {SERIES_TIMEOUT:g})")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="durée maximale de tout le lot en secondes ; au-delà, repli pour les séries restantes")
+    parser.add_argument("--store", default=STORE_DIR,
+                        help=f"dossier du cache des modèles ajustés (défaut : {STORE_DIR})")
+    parser.add_argument("--refit", action="store_true",
+                        help="ré-estime tous les modèles (sinon : mise à jour incrémentale des séries prolongées)")
+    parser.add_argument("--no-store", action="store_true", help="réajuste tous les modèles, sans cache")
+    parser.add_argument("--verbose", action="store_true", help="affiche les séries ignorées")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    domains = DOMAINS if "all" in args.domain else args.domain
+    store_dir = None if args.no_store else args.store
+    run(domains, year=args.year, workers=args.workers, merge=args.merge, store_dir=store_dir,
+        method=args.method, threshold=args.threshold, series_timeout=args.series_timeout or None,
+        budget=args.budget, joint=args.crise == "joint", refit=args.refit,
+        order_search=args.order_search, verbose=args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# forecasting/backtest.py — backtests à origine glissante : précision et coût de chaque modèle candidat
+"""
+Pour chaque domaine, chaque série et chaque année d'origine (ex: 2014, 2015, 2016), les modèles
+candidats sont ajustés sur l'historique antérieur à janvier de cette année puis comparés aux
+12 mois observés :
+
+- SARIMA (un candidat par jeu d'ordres, ajustements répartis sur un pool de processus)
+- méthodes rapides de fastpath (naïf saisonnier, moyenne saisonnière, dérive, Holt-Winters),
+  calculées pour toutes les séries à la fois
+
+Le rapport donne par domaine et par modèle le MAPE, le MASE et les percentiles du temps
+d'ajustement par série.
+
+Usage :
+    python -m forecasting.backtest                                   # tous les domaines
+    python -m forecasting.backtest --domain hr --origins 2015 2016 --workers 4
+    python -m forecasting.backtest --domain finance --output backtest.csv
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from forecasting.batch import DOMAINS, iter_series, load_monthly, monthly_path
+from forecasting.deadline import DONE, SERIES_TIMEOUT, run_with_deadlines
+from forecasting.fastpath import METHODS, SEASON, forecast_all, month_number, right_aligned
+from forecasting.sarima import forecast_year, prepare_series, silence_statsmodels_warnings, target_range
+
+
+# Candidats SARIMA : nom -> (order, seasonal_order)
+SARIMA_CANDIDATES = {
+    "sarima(1,1,1)(1,1,1)": ((1, 1, 1), (1, 1, 1, 12)),
+    "sarima(0,1,1)(0,1,1)": ((0, 1, 1), (0, 1, 1, 12)),
+}
+
+MODELS = (*SARIMA_CANDIDATES, *METHODS)
+
+ORIGINS = (2014, 2015, 2016)
+
+# Historique minimal avant l'origine (deux saisons)
+MIN_TRAIN = 2 * SEASON
+
+DETAIL_COLUMNS = ["site_code", "indicateur", "sous_indicateur", "origin", "model", "ok", "mape", "mase", "fit_seconds"]
+
+
+def _split(ts: pd.Series, year: int):
+    """(historique avant janvier de `year`, valeurs observées de `year`)."""
+    start, end = target_range(year)
+    ts = ts.dropna()
+    return ts[ts.index < start], ts[(ts.index >= start) & (ts.index <= end)]
+
+
+def mase_scale(train: pd.Series) -> float:
+    """Erreur moyenne du naïf saisonnier sur l'historique (dénominateur du MASE)."""
+    values = prepare_series(train.copy()).to_numpy(dtype="float64")
+    if len(values) <= SEASON:
+        return np.nan
+    return float(np.abs(values[SEASON:] - values[:-SEASON]).mean())
+
+
+def scores(pred: np.ndarray, actual: np.ndarray, scale: float) -> tuple:
+    """(MAPE en %, MASE) d'une prévision ; MAPE calculé sur les mois non nuls."""
+    err = np.abs(pred - actual)
+    nonzero = actual != 0
+    mape = float((err[nonzero] / np.abs(actual[nonzero])).mean() * 100) if nonzero.any() else np.nan
+    if np.isfinite(scale) and scale > 0:
+        mase = float(err.mean() / scale)
+    else:
+        # Historique parfaitement saisonnier : MASE nul si la prévision est exacte, indéfini sinon
+        mase = 0.0 if np.isfinite(scale) and err.max() == 0 else np.nan
+    return mape, mase
+
+
+def _sarima_task(task):
+    """Travail exécuté dans un processus : un ajustement SARIMA chronométré (NaN en cas d'échec)."""
+    train, year, order, seasonal_order = task
+    start = time.perf_counter()
+    try:
+        pred, _ = forecast_year(prepare_series(train.copy()), year, order, seasonal_order)
+        values = pred.to_numpy(dtype="float64")
+    except Exception:
+        values = np.full(SEASON, np.nan)
+    return values, time.perf_counter() - start
+
+
+def backtest_domain(domain: str, origins=ORIGINS, models=MODELS, workers: int = None,
+                    series_timeout: float = SERIES_TIMEOUT) -> pd.DataFrame:
+    """
+    Backtests d'un domaine.
+
+    Args:
+        domain: dossier de data/ (ex: "hr")
+        origins: années prévues successivement (historique = mois antérieurs)
+        models: modèles à évaluer (voir MODELS)
+        workers: nombre de processus pour les ajustements SARIMA (défaut : nombre de cœurs)
+        series_timeout: durée maximale d'un ajustement SARIMA en secondes
+
+    Returns:
+        DataFrame détaillé, une ligne par (série, origine, modèle) (voir DETAIL_COLUMNS)
+    """
+    items = list(iter_series(load_monthly(monthly_path(domain))))
+    workers = workers or os.cpu_count() or 1
+    rows = []
+    tasks, task_meta = [], []
+
+    for year in origins:
+        cases = []
+        for key, _, ts_value, _ in items:
+            train, actual = _split(ts_value, year)
+            if len(train) >= MIN_TRAIN and len(actual):
+                cases.append((key, train, actual, mase_scale(train)))
+        if not cases:
+            continue
+
+        # Méthodes rapides : toutes les séries en une fois, temps réparti entre les séries
+        fast_models = [m for m in models if m in METHODS]
+        if fast_models:
+            y, counts, last = right_aligned([train for _, train, _, _ in cases], target_range(year)[0])
+            offset = month_number([target_range(year)[0]])[0] - last
+            start = time.perf_counter()
+            forecasts = forecast_all(y, counts, int(offset.max()) + SEASON - 1)
+            per_series = (time.perf_counter() - start) / len(cases)
+            steps = offset[:, None] - 1 + np.arange(SEASON)[None, :]
+            for name in fast_models:
+                if name not in forecasts:
+                    continue
+                preds = np.take_along_axis(forecasts[name], steps, axis=1)
+                for (key, _, actual, scale), pred in zip(cases, preds):
+                    rows.append((*key, year, name, *_evaluate(pred, actual, year, scale), per_series))
+
+        for name in models:
+            if name in SARIMA_CANDIDATES:
+                order, seasonal_order = SARIMA_CANDIDATES[name]
+                for key, train, actual, scale in cases:
+                    tasks.append((train, year, order, seasonal_order))
+                    task_meta.append((key, year, name, actual, scale))
+
+    results = run_with_deadlines(_sarima_task, tasks, workers, series_timeout,
+                                 initializer=silence_statsmodels_warnings)
+    for (key, year, name, actual, scale), (status, out) in zip(task_meta, results):
+        if status == DONE:
+            pred, seconds = out
+        else:
+            pred, seconds = np.full(SEASON, np.nan), series_timeout or np.nan
+        rows.append((*key, year, name, *_evaluate(pred, actual, year, scale), seconds))
+
+    return pd.DataFrame(rows, columns=DETAIL_COLUMNS)
+
+
+def _evaluate(pred: np.ndarray, actual: pd.Series, year: int, scale: float) -> tuple:
+    """(prévision valide, MAPE, MASE) d'une prévision des 12 mois de `year` sur les mois observés."""
+    months = actual.index.month.to_numpy() - 1
+    pred = np.asarray(pred, dtype="float64")[months]
+    if not np.isfinite(pred).all():
+        return False, np.nan, np.nan
+    return (True, *scores(pred, actual.to_numpy(dtype="float64"), scale))
+
+
+def summarize(detail: pd.DataFrame) -> pd.DataFrame:
+    """Rapport par (domaine, modèle) : MAPE / MASE médians et moyens, percentiles du temps par série."""
+    grouped = detail.groupby(["domain", "model"], sort=False)
+    summary = grouped.agg(
+        cases=("mase", "size"),
+        failed=("ok", lambda s: int((~s).sum())),
+        mape_median=("mape", "median"),
+        mase_median=("mase", "median"),
+        mase_mean=("mase", "mean"),
+        fit_ms_p50=("fit_seconds", lambda s: s.quantile(0.50) * 1000),
+        fit_ms_p90=("fit_seconds", lambda s: s.quantile(0.90) * 1000),
+        fit_ms_p99=("fit_seconds", lambda s: s.quantile(0.99) * 1000),
+    )
+    return summary.round(3).reset_index()
+
+
+def run(domains, origins=ORIGINS, models=MODELS, workers: int = None, series_timeout: float = SERIES_TIMEOUT,
+        output: str = None) -> pd.DataFrame:
+    """Backtests de plusieurs domaines ; affiche le rapport et écrit le détail dans `output` si donné."""
+    details = []
+    for domain in domains:
+        start = time.perf_counter()
+        detail = backtest_domain(domain, origins, models, workers, series_timeout)
+        detail.insert(0, "domain", domain)
+        details.append(detail)
+        print(f"{domain}: {len(detail)} évaluations ({time.perf_counter() - start:.1f} s)")
+    detail = pd.concat(details, ignore_index=True)
+    if output:
+        detail.to_csv(output, index=False)
+    summary = summarize(detail)
+    print(summary.to_string(index=False))
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m forecasting.backtest",
+        description="Backtests à origine glissante des modèles de prévision (précision et coût).",
+    )
+    parser.add_argument("--domain", nargs="+", default=["all"], choices=["all", *DOMAINS],
+                        help="domaine(s) évalué(s) (défaut : all)")
+    parser.add_argument("--origins", nargs="+", type=int, default=list(ORIGINS),
+                        help="années prévues successivement (défaut : 2014 2015 2016)")
+    parser.add_argument("--models", nargs="+", default=list(MODELS), choices=MODELS,
+                        help="modèles évalués (défaut : tous)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus pour SARIMA (défaut : nombre de cœurs)")
+    parser.add_argument("--series-timeout", type=float, default=SERIES_TIMEOUT,
+                        help=f"durée maximale d'un ajustement en secondes, 0 = sans limite (défaut : {SERIES_TIMEOUT:g})")
+    parser.add_argument("--output", default=None, help="CSV du détail par série, origine et modèle")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    domains = DOMAINS if "all" in args.domain else args.domain
+    run(domains, args.origins, args.models, args.workers, args.series_timeout or None, args.output)
+
+
+if __name__ == "__main__":
+    main()
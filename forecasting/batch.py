@@ -0,0 +1,269 @@
+# forecasting/batch.py — prévisions de toutes les séries d'un domaine, en parallèle sur plusieurs processus
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from datastore import refresh_columnar
+from forecasting.classify import TOO_SHORT, degenerate_forecasts
+from forecasting.deadline import BUDGET, DONE, FAILED, SERIES_TIMEOUT, TIMEOUT, run_with_deadlines
+from forecasting.fastpath import SARIMA_THRESHOLD, fast_forecasts
+from forecasting.sarima import MIN_POINTS, fallback_series, forecast_series, silence_statsmodels_warnings
+from forecasting.store import STORE_DIR, ModelStore
+
+
+DATA_DIR = "data"
+
+# Domaines (un dossier data/<domaine>/ chacun)
+DOMAINS = (
+    "activity-service",
+    "capacity",
+    "finance",
+    "hr",
+    "logistics",
+    "patients",
+    "quality",
+)
+
+GROUP_COLUMNS = ["site_code", "indicateur", "sous_indicateur"]
+
+OUT_COLUMNS = ["year", "month", "site_code", "indicateur", "sous_indicateur", "unite", "value", "value_crise"]
+
+
+def monthly_path(domain: str) -> str:
+    """CSV mensuel reconstitué d'un domaine (historique utilisé pour la prévision)."""
+    return os.path.join(DATA_DIR, domain, f"{domain}-donnees_mensuelles_reconstituees.csv")
+
+
+def forecast_path(domain: str, year: int) -> str:
+    """CSV des prévisions d'un domaine pour une année."""
+    return os.path.join(DATA_DIR, domain, f"forecast_{year}_all_indicators.csv")
+
+
+def report_path(domain: str, year: int) -> str:
+    """CSV du rapport d'exécution (chemin suivi par chaque série)."""
+    return os.path.join(DATA_DIR, domain, f"forecast_{year}_report.csv")
+
+
+def all_path(domain: str) -> str:
+    """CSV historique + prévisions lu par l'application."""
+    return os.path.join(DATA_DIR, domain, f"{domain}-all.csv")
+
+
+def load_monthly(path: str) -> pd.DataFrame:
+    """Charge un CSV mensuel et ajoute la date (1er du mois)."""
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df[["year", "month"]].assign(day=1))
+    # Si sous_indicateur n'existe pas, on la crée vide
+    if "sous_indicateur" not in df.columns:
+        df["sous_indicateur"] = "NA"
+    return df
+
+
+def iter_series(df: pd.DataFrame):
+    """
+    Découpe le DataFrame en séries (site_code, indicateur, sous_indicateur) en un seul passage.
+
+    Returns:
+        générateur de (clé, unite, série value, série value_crise), dans l'ordre d'apparition
+    """
+    cols = ["date", "value", "value_crise", "unite"]
+    for key, sub in df.groupby(GROUP_COLUMNS, sort=False)[cols]:
+        indexed = sub.set_index("date")
+        yield (
+            key,
+            sub["unite"].iloc[0],
+            indexed["value"].sort_index(),
+            indexed["value_crise"].sort_index(),
+        )
+
+
+def _forecast_task(task):
+    """Travail exécuté dans un processus : prévision d'une série (erreurs renvoyées, jamais levées)."""
+    key, unite, ts_value, ts_crise, year, min_points, store, joint, order_search = task
+    try:
+        rows = forecast_series(key, unite, ts_value, ts_crise, year, min_points=min_points, store=store, joint=joint,
+                               order_search=order_search)
+        return key, rows, None
+    except Exception as e:
+        return key, [], str(e)
+
+
+def _fallback_task(task, status):
+    """Repli (moyenne des mêmes mois) d'une tâche arrêtée ; le statut sert de chemin au rapport."""
+    key, unite, ts_value, ts_crise, year, min_points, _, joint, _ = task
+    try:
+        return key, fallback_series(key, unite, ts_value, ts_crise, year, min_points=min_points, joint=joint), status
+    except Exception as e:
+        return key, [], str(e)
+
+
+def run_tasks(tasks: list, workers: int = None, series_timeout: float = SERIES_TIMEOUT, deadline: float = None,
+              verbose: bool = False) -> list:
+    """
+    Exécute les prévisions, séquentiellement (workers=1) ou sur un pool de processus.
+
+    Avec une limite par série (series_timeout, secondes) ou une échéance globale (deadline,
+    temps time.monotonic()), les ajustements hors délai sont arrêtés et remplacés par le repli.
+
+    Returns:
+        (chemin, lignes de sortie) de chaque tâche, dans l'ordre des tâches
+    """
+    if not tasks:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if series_timeout or deadline is not None:
+        statuses = run_with_deadlines(_forecast_task, tasks, workers, series_timeout, deadline,
+                                      initializer=silence_statsmodels_warnings)
+        outcomes = [
+            out if status == DONE else _fallback_task(task, status)
+            for task, (status, out) in zip(tasks, statuses)
+        ]
+        return _collect(outcomes, verbose)
+    if workers <= 1 or len(tasks) <= 1:
+        silence_statsmodels_warnings()
+        outcomes = map(_forecast_task, tasks)
+        return _collect(outcomes, verbose)
+    with ProcessPoolExecutor(max_workers=workers, initializer=silence_statsmodels_warnings) as pool:
+        # map conserve l'ordre des tâches : sortie identique à l'exécution séquentielle
+        outcomes = pool.map(_forecast_task, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+        return _collect(outcomes, verbose)
+
+
+def _collect(outcomes, verbose: bool) -> list:
+    results = []
+    for key, series_rows, error in outcomes:
+        if error is None:
+            path = "sarima"
+        elif error in (TIMEOUT, BUDGET, FAILED):
+            path = error
+            print(f"Repli ({error}) :", *key)
+        else:
+            path = "error"
+            print("Erreur modèle :", *key)
+            print(error)
+        if path == "sarima" and not series_rows and verbose:
+            print("Skip (pas assez de points):", *key)
+        results.append((path, series_rows))
+    return results
+
+
+# Choix du modèle : "sarima" (comme les notebooks), "auto" (rapide si suffisant), "fast" (jamais SARIMA)
+METHOD_CHOICES = ("auto", "sarima", "fast")
+
+
+def forecast_domain(domain: str, year: int = 2017, workers: int = None, min_points: int = MIN_POINTS,
+                    store_dir: str = STORE_DIR, method: str = "auto", threshold: float = SARIMA_THRESHOLD,
+                    series_timeout: float = SERIES_TIMEOUT, deadline: float = None, joint: bool = True,
+                    refit: bool = False, order_search: bool = False, verbose: bool = False,
+                    df: pd.DataFrame = None):
+    """
+    Prévisions de toutes les séries d'un domaine pour `year`.
+
+    Args:
+        domain: dossier de data/ (ex: "hr")
+        year: année à prévoir
+        workers: nombre de processus (défaut : nombre de cœurs)
+        min_points: nombre minimal de mois d'historique par série
+        store_dir: dossier du cache des modèles ajustés (None : tout réajuster)
+        method: "auto", "sarima" ou "fast" (voir METHOD_CHOICES)
+        threshold: MASE au-delà duquel une série passe en SARIMA (méthode "auto")
+        series_timeout: durée maximale d'un ajustement SARIMA en secondes (None : sans limite)
+        deadline: échéance globale (time.monotonic()) au-delà de laquelle les ajustements restants
+            sont remplacés par le repli
+        joint: value_crise déduite de la prévision value (profil de ratio) au lieu d'un second modèle
+        refit: ré-estime tous les modèles SARIMA au lieu des mises à jour incrémentales
+        order_search: ordres SARIMA choisis par série (colonne "order" ajoutée aux prévisions)
+        df: données mensuelles déjà chargées (voir load_monthly), par exemple une partie des séries ;
+            défaut : le CSV mensuel du domaine
+
+    Returns:
+        (prévisions au format forecast_<year>_all_indicators.csv,
+         rapport : chemin suivi par chaque série — classe dégénérée, méthode rapide ou sarima)
+    """
+    if df is None:
+        df = load_monthly(monthly_path(domain))
+    store = ModelStore(store_dir, domain, refit) if store_dir else None
+    items = list(iter_series(df))
+
+    # 1) Séries dégénérées (constantes, paliers, trop courtes...) : prévision directe ;
+    #    en "sarima", toutes les séries passent par SARIMA, seules les trop courtes sont ignorées
+    if method == "sarima":
+        done = {i: (TOO_SHORT, []) for i, item in enumerate(items) if len(item[2]) < min_points}
+    else:
+        done = degenerate_forecasts(items, year, min_points, joint=joint)
+    # 2) Méthodes rapides vectorisées pour les autres, quand elles suffisent
+    if method != "sarima":
+        pending = [i for i in range(len(items)) if i not in done]
+        fast = fast_forecasts([items[i] for i in pending], year, min_points,
+                              np.inf if method == "fast" else threshold, joint=joint)
+        done.update({pending[j]: result for j, result in fast.items()})
+    # 3) SARIMA pour le reste
+    tasks = [
+        (key, unite, ts_value, ts_crise, year, min_points, store, joint, order_search)
+        for i, (key, unite, ts_value, ts_crise) in enumerate(items)
+        if i not in done
+    ]
+    sarima_results = iter(run_tasks(tasks, workers=workers, series_timeout=series_timeout, deadline=deadline,
+                                    verbose=verbose))
+
+    rows = []
+    report = []
+    for i, (key, *_) in enumerate(items):
+        if i in done:
+            path, series_rows = done[i]
+        else:
+            path, series_rows = next(sarima_results)
+        report.append((*key, path, len(series_rows)))
+        rows.extend(series_rows)
+    report_df = pd.DataFrame(report, columns=[*GROUP_COLUMNS, "path", "rows"])
+    summary = report_df["path"].value_counts().sort_index()
+    print(f"{domain}: " + ", ".join(f"{path} {count}" for path, count in summary.items()))
+    columns = OUT_COLUMNS + ["order"] if order_search else OUT_COLUMNS
+    return pd.DataFrame(rows, columns=columns), report_df
+
+
+def merge_history(domain: str, forecast_df: pd.DataFrame, df_hist: pd.DataFrame = None) -> pd.DataFrame:
+    """Historique mensuel (défaut : CSV mensuel du domaine) + prévisions, trié comme <domaine>-all.csv."""
+    if df_hist is None:
+        df_hist = pd.read_csv(monthly_path(domain))
+    merged = pd.concat([df_hist, forecast_df[OUT_COLUMNS]], ignore_index=True)
+    return merged.sort_values(["site_code", "indicateur", "sous_indicateur", "year", "month"])
+
+
+def run(domains, year: int = 2017, workers: int = None, merge: bool = False, store_dir: str = STORE_DIR,
+        method: str = "auto", threshold: float = SARIMA_THRESHOLD, series_timeout: float = SERIES_TIMEOUT,
+        budget: float = None, joint: bool = True, refit: bool = False, order_search: bool = False,
+        verbose: bool = False) -> dict:
+    """
+    Génère forecast_<year>_all_indicators.csv et le rapport forecast_<year>_report.csv pour chaque
+    domaine (et <domaine>-all.csv si merge).
+
+    Args:
+        budget: durée maximale de l'ensemble du lot en secondes (None : sans limite)
+
+    Returns:
+        {domaine: chemin du CSV de prévisions écrit}
+    """
+    deadline = time.monotonic() + budget if budget else None
+    written = {}
+    for domain in domains:
+        start = time.perf_counter()
+        forecast_df, report_df = forecast_domain(
+            domain, year=year, workers=workers, store_dir=store_dir, method=method, threshold=threshold,
+            series_timeout=series_timeout, deadline=deadline, joint=joint, refit=refit, order_search=order_search,
+            verbose=verbose,
+        )
+        out = forecast_path(domain, year)
+        forecast_df.to_csv(out, index=False)
+        refresh_columnar(out)
+        report_df.to_csv(report_path(domain, year), index=False)
+        written[domain] = out
+        print(f"{domain}: {len(forecast_df)} lignes -> {out} ({time.perf_counter() - start:.1f} s)")
+        if merge:
+            merge_history(domain, forecast_df).to_csv(all_path(domain), index=False)
+            refresh_columnar(all_path(domain))
+            print(f"{domain}: historique + prévisions -> {all_path(domain)}")
+    return written
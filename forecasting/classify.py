@@ -0,0 +1,151 @@
+# forecasting/classify.py — détection des séries dégénérées (constantes, paliers, nulles, courtes, creuses)
+"""
+Classement de toutes les séries d'un domaine en un seul passage vectorisé, avant tout
+ajustement de modèle :
+
+- too_short : moins de MIN_POINTS mois d'historique -> pas de prévision (comme les notebooks)
+- all_zero  : uniquement des zéros -> prévision nulle
+- constant  : une seule valeur -> cette valeur
+- step      : paliers constants (au plus un changement par an en moyenne) -> dernier palier
+- sparse    : moins de SPARSE_RATIO de mois renseignés -> moyenne des mêmes mois
+- regular   : série à modéliser (méthodes rapides ou SARIMA)
+"""
+
+import numpy as np
+import pandas as pd
+
+from forecasting.fastpath import SEASON, aligned_matrix
+from forecasting.sarima import MIN_POINTS, forecast_rows, ratio_forecast, seasonal_ratio_forecast, target_range
+
+TOO_SHORT = "too_short"
+ALL_ZERO = "all_zero"
+CONSTANT = "constant"
+STEP = "step"
+SPARSE = "sparse"
+REGULAR = "regular"
+
+# Part minimale de mois renseignés entre le premier et le dernier mois observé
+SPARSE_RATIO = 0.5
+
+# Tolérance relative pour considérer deux valeurs égales
+TOLERANCE = 1e-9
+
+
+def classify(raw: np.ndarray, counts: np.ndarray, lengths: np.ndarray, min_points: int = MIN_POINTS) -> np.ndarray:
+    """
+    Classe de chaque série (ligne) de la matrice.
+
+    Args:
+        raw: matrice brute alignée à droite (voir fastpath.aligned_matrix), NaN = mois absent
+        counts: nombre de mois couverts par série (du premier au dernier mois observé)
+        lengths: nombre de lignes d'historique par série (critère too_short des notebooks)
+        min_points: nombre minimal de mois d'historique
+
+    Returns:
+        tableau de classes (chaînes)
+    """
+    observed = ~np.isnan(raw)
+    n_obs = observed.sum(axis=1)
+    scale = np.nanmax(np.abs(raw), axis=1, initial=0.0)
+    tol = TOLERANCE * (1.0 + scale)
+
+    lo = np.nanmin(np.where(observed, raw, np.inf), axis=1)
+    hi = np.nanmax(np.where(observed, raw, -np.inf), axis=1)
+    constant = (hi - lo) <= tol
+    all_zero = constant & (scale <= tol)
+
+    # Paliers : changements entre mois observés consécutifs (trous comblés par la valeur précédente)
+    held = pd.DataFrame(raw).ffill(axis=1).to_numpy()
+    changes = (np.abs(np.diff(held, axis=1)) > tol[:, None]).sum(axis=1)
+    step = ~constant & (changes <= np.maximum(1, counts // SEASON))
+
+    sparse = n_obs < SPARSE_RATIO * np.maximum(counts, 1)
+
+    classes = np.full(len(raw), REGULAR, dtype=object)
+    classes[sparse] = SPARSE
+    classes[step] = STEP
+    classes[constant] = CONSTANT
+    classes[all_zero] = ALL_ZERO
+    classes[(lengths < min_points) | (n_obs == 0)] = TOO_SHORT
+    return classes
+
+
+def closed_form(raw: np.ndarray, last: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """
+    Prévision sans modèle des 12 mois suivant janvier de l'année cible, selon la classe.
+
+    Returns:
+        matrice (séries x 12) ; NaN pour les classes regular / too_short
+    """
+    n, width = raw.shape
+    out = np.full((n, SEASON), np.nan)
+
+    # Dernière valeur observée (constante, palier)
+    held = pd.DataFrame(raw).ffill(axis=1).to_numpy()
+    last_value = held[:, -1]
+    level = np.isin(classes, (CONSTANT, STEP))
+    out[level] = last_value[level, None]
+    out[classes == ALL_ZERO] = 0.0
+
+    # Creuse : moyenne des mêmes mois calendaires, sinon moyenne globale
+    sparse = classes == SPARSE
+    if sparse.any():
+        month = (last[:, None] - (width - 1 - np.arange(width))[None, :]) % SEASON
+        values = np.where(np.isnan(raw), 0.0, raw)
+        observed = ~np.isnan(raw)
+        for m in range(SEASON):
+            in_month = observed & (month == m)
+            total = np.where(in_month, values, 0.0).sum(axis=1)
+            count = in_month.sum(axis=1)
+            out[sparse, m] = np.where(count > 0, total / np.maximum(count, 1), np.nan)[sparse]
+        overall = np.where(observed, values, 0.0).sum(axis=1) / np.maximum(observed.sum(axis=1), 1)
+        gaps = sparse[:, None] & np.isnan(out)
+        out[gaps] = np.broadcast_to(overall[:, None], out.shape)[gaps]
+    return out
+
+
+def degenerate_forecasts(items: list, year: int, min_points: int = MIN_POINTS, joint: bool = False) -> dict:
+    """
+    Classe les séries d'un domaine et prévoit directement les séries dégénérées.
+
+    Une série n'est traitée ici que si value est dégénérée et que value_crise l'est aussi
+    (ou a trop peu de points, auquel cas le ratio historique s'applique comme d'habitude).
+    En mode joint, seule value compte : value_crise suit le profil de ratio.
+
+    Args:
+        items: liste de (clé, unite, série value, série value_crise) (voir batch.iter_series)
+        year: année à prévoir
+        min_points: nombre minimal de mois d'historique
+
+    Returns:
+        {position dans items: (classe, lignes de sortie)} ; les séries absentes sont à modéliser
+    """
+    if not items:
+        return {}
+    target_start = target_range(year)[0]
+    dates = pd.date_range(target_start, periods=SEASON, freq="MS")
+    n = len(items)
+
+    series = [item[2] for item in items] + [item[3] for item in items]
+    raw, counts, last = aligned_matrix(series, target_start)
+    lengths = np.array([len(item[2]) for item in items] + [item[3].notna().sum() for item in items])
+    classes = classify(raw, counts, lengths, min_points)
+    preds = closed_form(raw, last, classes)
+
+    out = {}
+    for i, (key, unite, ts_value, ts_crise) in enumerate(items):
+        value_class, crise_class = classes[i], classes[n + i]
+        if value_class == TOO_SHORT:
+            out[i] = (TOO_SHORT, [])
+            continue
+        if value_class == REGULAR or (crise_class == REGULAR and not joint):
+            continue
+        pred_value = pd.Series(preds[i], index=dates)
+        if joint:
+            pred_crise = seasonal_ratio_forecast(ts_crise, ts_value, pred_value)
+        elif crise_class == TOO_SHORT:
+            pred_crise = ratio_forecast(ts_crise, ts_value, pred_value)
+        else:
+            pred_crise = pd.Series(preds[n + i], index=dates)
+        out[i] = (value_class, forecast_rows(key, unite, ts_value, ts_crise, pred_value, pred_crise))
+    return out
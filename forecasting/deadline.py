@@ -0,0 +1,131 @@
+# forecasting/deadline.py — exécution des ajustements avec limite de temps par série et budget global
+"""
+Pool de processus minimal où chaque tâche a une durée maximale : un processus qui dépasse
+son budget est arrêté (terminate) puis remplacé, et la tâche est marquée TIMEOUT.
+Passé l'échéance globale, les tâches en cours sont arrêtées et celles qui restent marquées
+BUDGET. L'appelant applique alors sa prévision de repli.
+
+ProcessPoolExecutor ne permet pas d'arrêter une tâche déjà démarrée, d'où ce pool dédié.
+"""
+
+import multiprocessing as mp
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+
+# Durée maximale d'un ajustement (secondes) ; None : pas de limite
+SERIES_TIMEOUT = 120.0
+
+# Statuts des tâches
+DONE = "done"
+TIMEOUT = "timeout"
+BUDGET = "budget"
+FAILED = "failed"
+
+
+def _worker_loop(conn, func, initializer):
+    """Boucle d'un processus : reçoit (indice, tâche), renvoie (indice, résultat) ; None pour s'arrêter."""
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        index, task = message
+        conn.send((index, func(task)))
+
+
+def _start_worker(ctx, func, initializer):
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_worker_loop, args=(child, func, initializer), daemon=True)
+    proc.start()
+    child.close()
+    return proc, parent
+
+
+def _stop_worker(worker, kill: bool = False):
+    proc, conn = worker
+    if kill:
+        proc.terminate()
+    else:
+        try:
+            conn.send(None)
+        except (OSError, ValueError):
+            proc.terminate()
+    proc.join(timeout=5)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+    conn.close()
+
+
+def run_with_deadlines(func, tasks: list, workers: int = 1, task_timeout: float = SERIES_TIMEOUT,
+                       deadline: float = None, initializer=None) -> list:
+    """
+    Exécute `func` sur chaque tâche dans des processus, avec limite par tâche et échéance globale.
+
+    Args:
+        func: fonction de niveau module (une tâche -> un résultat), qui ne lève pas d'exception
+        tasks: liste de tâches (picklables)
+        workers: nombre de processus
+        task_timeout: durée maximale d'une tâche en secondes (None : pas de limite)
+        deadline: échéance globale en temps time.monotonic() (None : pas d'échéance)
+        initializer: fonction appelée au démarrage de chaque processus
+
+    Returns:
+        liste de (statut, résultat) dans l'ordre des tâches ; résultat None si statut != DONE
+    """
+    results = [(BUDGET, None)] * len(tasks)
+    if not tasks or (deadline is not None and time.monotonic() >= deadline):
+        return results
+
+    ctx = mp.get_context()
+    pending = deque(range(len(tasks)))
+    pool = [_start_worker(ctx, func, initializer) for _ in range(max(1, min(workers, len(tasks))))]
+    busy = {}  # position dans pool -> (indice de tâche, début)
+    try:
+        while pending or busy:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            for w in range(len(pool)):
+                if w not in busy and pending:
+                    index = pending.popleft()
+                    pool[w][1].send((index, tasks[index]))
+                    busy[w] = (index, now)
+
+            # Attente du premier résultat ou de la prochaine échéance
+            limits = [] if deadline is None else [deadline]
+            if task_timeout:
+                limits += [started + task_timeout for _, started in busy.values()]
+            timeout = max(0.0, min(limits) - now) if limits else None
+            conns = {pool[w][1]: w for w in busy}
+            for conn in wait(list(conns), timeout):
+                w = conns[conn]
+                index, _ = busy.pop(w)
+                try:
+                    received, out = conn.recv()
+                    results[received] = (DONE, out)
+                except (EOFError, OSError):
+                    # Processus mort (mémoire, signal...) : tâche en échec, processus remplacé
+                    results[index] = (FAILED, None)
+                    _stop_worker(pool[w], kill=True)
+                    pool[w] = _start_worker(ctx, func, initializer)
+
+            # Tâches hors délai : arrêt du processus, puis remplacement
+            if task_timeout:
+                now = time.monotonic()
+                for w, (index, started) in list(busy.items()):
+                    if now - started >= task_timeout:
+                        del busy[w]
+                        results[index] = (TIMEOUT, None)
+                        _stop_worker(pool[w], kill=True)
+                        pool[w] = _start_worker(ctx, func, initializer)
+    finally:
+        for w, worker in enumerate(pool):
+            _stop_worker(worker, kill=w in busy)
+    return results
@@ -0,0 +1,268 @@
+# forecasting/fastpath.py — prévisions vectorisées (NumPy) sur toutes les séries à la fois + sélection du modèle
+"""
+Les séries d'un domaine sont rangées dans une matrice (séries x mois), alignée à droite
+sur le dernier mois observé de chaque série. Quatre méthodes tournent sur toute la matrice :
+
+- naïf saisonnier : répète la dernière année
+- moyenne saisonnière : moyenne des mêmes mois de l'historique (repli des notebooks)
+- dérive : dernière valeur + pente moyenne
+- Holt-Winters additif : lissage exponentiel, paramètres choisis sur une petite grille
+
+Sélection : chaque méthode est évaluée sur les 12 derniers mois connus (holdout). Si la
+meilleure fait au moins aussi bien que le naïf saisonnier dans l'échantillon (MASE <= seuil),
+la série est prévue ici ; sinon elle est envoyée à SARIMA.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from forecasting.sarima import MIN_POINTS, forecast_rows, ratio_forecast, seasonal_ratio_forecast, target_range
+
+
+SEASON = 12
+HOLDOUT = 12
+
+# Au-delà de ce MASE (erreur holdout / erreur du naïf saisonnier), la série part en SARIMA
+SARIMA_THRESHOLD = 1.0
+
+# Grille Holt-Winters (alpha : niveau, beta : tendance, gamma : saison)
+HW_ALPHAS = (0.1, 0.2, 0.4, 0.6, 0.8)
+HW_BETAS = (0.0, 0.05, 0.15)
+HW_GAMMAS = (0.05, 0.15, 0.3)
+
+METHODS = ("seasonal_naive", "seasonal_mean", "drift", "holt_winters")
+
+# Méthode retenue par série (None : SARIMA) + MASE holdout de la meilleure méthode rapide
+Selection = namedtuple("Selection", ["method", "score"])
+
+
+def month_number(dates) -> np.ndarray:
+    """Numéro de mois absolu (année * 12 + mois - 1)."""
+    dates = pd.DatetimeIndex(dates)
+    return np.asarray(dates.year * 12 + dates.month - 1, dtype="int64")
+
+
+def aligned_matrix(series: list, before) -> tuple:
+    """
+    Range les séries dans une matrice alignée à droite, en ne gardant que les mois < `before`.
+
+    Args:
+        series: liste de pd.Series mensuelles (index datetime)
+        before: premier mois exclu (début de l'année à prévoir)
+
+    Returns:
+        (matrice brute avec NaN, nombre de mois couverts par série, dernier mois observé par série)
+    """
+    limit = month_number([before])[0]
+    parts = []
+    for ts in series:
+        ts = ts[ts.notna()]
+        t = month_number(ts.index)
+        keep = t < limit
+        parts.append((t[keep], ts.to_numpy(dtype="float64")[keep]))
+
+    n = len(parts)
+    last = np.array([t.max() if len(t) else -1 for t, _ in parts], dtype="int64")
+    first = np.array([t.min() if len(t) else 0 for t, _ in parts], dtype="int64")
+    width = int(max(1, (last - first + 1).max(initial=1)))
+    raw = np.full((n, width), np.nan)
+    for i, (t, v) in enumerate(parts):
+        if len(t):
+            raw[i, width - 1 - (last[i] - t)] = v
+    counts = np.where(last >= 0, last - first + 1, 0)
+    return raw, counts, last
+
+
+def right_aligned(series: list, before) -> tuple:
+    """
+    Comme aligned_matrix, avec les trous intérieurs interpolés linéairement et le début des
+    séries courtes complété par leur première valeur (comme prepare_series).
+    """
+    raw, counts, last = aligned_matrix(series, before)
+    filled = pd.DataFrame(raw).interpolate(axis=1, limit_area="inside").bfill(axis=1).to_numpy()
+    return filled, counts, last
+
+
+def seasonal_naive(y: np.ndarray, horizon: int) -> np.ndarray:
+    k = np.arange(horizon)
+    return y[:, y.shape[1] - SEASON + (k % SEASON)]
+
+
+def seasonal_mean(y: np.ndarray, counts: np.ndarray, horizon: int) -> np.ndarray:
+    width = y.shape[1]
+    cycles = width // SEASON
+    block = y[:, width - cycles * SEASON:].reshape(len(y), cycles, SEASON)
+    # Les mois de complément (avant le début réel de la série) ne comptent pas dans la moyenne
+    age = (np.arange(cycles * SEASON)[::-1]).reshape(cycles, SEASON)
+    mask = age[None, :, :] < counts[:, None, None]
+    sums = np.where(mask, block, 0.0).sum(axis=1)
+    n = mask.sum(axis=1)
+    means = np.divide(sums, n, out=y[:, -SEASON:].copy(), where=n > 0)
+    k = np.arange(horizon)
+    return means[:, k % SEASON]
+
+
+def drift(y: np.ndarray, counts: np.ndarray, horizon: int) -> np.ndarray:
+    width = y.shape[1]
+    start = y[np.arange(len(y)), width - np.clip(counts, 1, width)]
+    slope = np.divide(y[:, -1] - start, counts - 1, out=np.zeros(len(y)), where=counts > 1)
+    k = np.arange(1, horizon + 1)
+    return y[:, -1:] + slope[:, None] * k[None, :]
+
+
+def holt_winters(y: np.ndarray, horizon: int) -> np.ndarray:
+    """Holt-Winters additif, paramètres choisis par série (erreur à un pas minimale sur la grille)."""
+    n, width = y.shape
+    grid = np.array([(a, b, g) for a in HW_ALPHAS for b in HW_BETAS for g in HW_GAMMAS])
+    alpha, beta, gamma = grid[:, 0][None, :], grid[:, 1][None, :], grid[:, 2][None, :]
+    combos = len(grid)
+
+    # Initialisation sur les deux premières saisons
+    first = y[:, :SEASON].mean(axis=1)
+    second = y[:, SEASON:2 * SEASON].mean(axis=1)
+    level = np.repeat(first[:, None], combos, axis=1)
+    trend = np.repeat(((second - first) / SEASON)[:, None], combos, axis=1)
+    season = np.repeat((y[:, :SEASON] - first[:, None])[:, None, :], combos, axis=1)
+    sse = np.zeros((n, combos))
+
+    for t in range(SEASON, width):
+        obs = y[:, t][:, None]
+        slot = t % SEASON
+        s = season[:, :, slot]
+        err = obs - (level + trend + s)
+        sse += err * err
+        new_level = alpha * (obs - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, slot] = gamma * (obs - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(n)
+    level, trend, season = level[rows, best], trend[rows, best], season[rows, best]
+    k = np.arange(1, horizon + 1)
+    slots = (width + k - 1) % SEASON
+    return level[:, None] + trend[:, None] * k[None, :] + season[:, slots]
+
+
+def forecast_all(y: np.ndarray, counts: np.ndarray, horizon: int) -> dict:
+    """Prévisions de toutes les méthodes : {méthode: matrice (séries x horizon)}."""
+    out = {
+        "seasonal_naive": seasonal_naive(y, horizon),
+        "seasonal_mean": seasonal_mean(y, counts, horizon),
+        "drift": drift(y, counts, horizon),
+    }
+    if y.shape[1] >= 2 * SEASON:
+        out["holt_winters"] = holt_winters(y, horizon)
+    return out
+
+
+def select_methods(y: np.ndarray, counts: np.ndarray, threshold: float = SARIMA_THRESHOLD) -> list:
+    """
+    Choisit une méthode rapide par série d'après un holdout sur les 12 derniers mois connus.
+
+    Returns:
+        liste de Selection (method=None : la série doit passer par SARIMA)
+    """
+    train, actual = y[:, :-HOLDOUT], y[:, -HOLDOUT:]
+    train_counts = counts - HOLDOUT
+    forecasts = forecast_all(train, train_counts, HOLDOUT)
+    names = list(forecasts)
+    mae = np.stack([np.abs(forecasts[m] - actual).mean(axis=1) for m in names], axis=1)
+
+    # Échelle MASE : erreur moyenne du naïf saisonnier dans l'échantillon d'apprentissage
+    diffs = np.abs(train[:, SEASON:] - train[:, :-SEASON])
+    age = np.arange(diffs.shape[1])[::-1]
+    valid = age[None, :] < (train_counts - SEASON)[:, None]
+    n_valid = valid.sum(axis=1)
+    scale = np.divide(np.where(valid, diffs, 0.0).sum(axis=1), n_valid,
+                      out=np.zeros(len(y)), where=n_valid > 0)
+
+    best = mae.argmin(axis=1)
+    best_mae = mae[np.arange(len(y)), best]
+    tol = 1e-9 * (1.0 + np.abs(actual).max(axis=1))
+    score = np.where(scale > tol, best_mae / np.maximum(scale, tol), np.where(best_mae <= tol, 0.0, np.inf))
+    enough = train_counts >= 2 * SEASON
+    return [
+        Selection(names[b] if ok and sc <= threshold else None, float(sc) if ok else np.inf)
+        for b, sc, ok in zip(best, score, enough)
+    ]
+
+
+def forecast_target(y: np.ndarray, counts: np.ndarray, last: np.ndarray, methods: list, year: int) -> np.ndarray:
+    """
+    Prévisions des 12 mois de `year` avec la méthode choisie pour chaque série.
+
+    Returns:
+        matrice (séries x 12) ; NaN pour les séries sans méthode
+    """
+    target_t0 = month_number([target_range(year)[0]])[0]
+    offset = target_t0 - last  # pas entre le dernier mois observé et janvier de l'année cible
+    horizon = int(offset.max(initial=1)) + SEASON - 1
+    forecasts = forecast_all(y, counts, horizon)
+    steps = offset[:, None] - 1 + np.arange(SEASON)[None, :]
+    out = np.full((len(y), SEASON), np.nan)
+    for name, fc in forecasts.items():
+        rows = np.array([m == name for m in methods])
+        if rows.any():
+            out[rows] = np.take_along_axis(fc[rows], steps[rows], axis=1)
+    return out
+
+
+def fast_forecasts(items: list, year: int, min_points: int = MIN_POINTS, threshold: float = SARIMA_THRESHOLD,
+                   joint: bool = False) -> dict:
+    """
+    Prévisions rapides des séries d'un domaine, pour celles où une méthode simple suffit.
+
+    Args:
+        items: liste de (clé, unite, série value, série value_crise) (voir batch.iter_series)
+        year: année à prévoir
+        min_points: nombre minimal de mois d'historique (séries plus courtes ignorées)
+        threshold: MASE maximal accepté (np.inf : jamais de SARIMA)
+        joint: value_crise déduite de value par le profil de ratio (voir sarima.seasonal_ratio_forecast)
+
+    Returns:
+        {position dans items: (méthode, lignes de sortie)} ; les séries absentes vont à SARIMA
+    """
+    eligible = [i for i, item in enumerate(items) if len(item[2]) >= min_points]
+    if not eligible:
+        return {}
+    target_start = target_range(year)[0]
+    dates = pd.date_range(target_start, periods=SEASON, freq="MS")
+
+    # value et value_crise (quand assez de points, hors mode joint) dans la même matrice
+    crise_rows = [] if joint else [i for i in eligible if items[i][3].notna().sum() >= min_points]
+    series = [items[i][2] for i in eligible] + [items[i][3] for i in crise_rows]
+    y, counts, last = right_aligned(series, target_start)
+    if y.shape[1] >= HOLDOUT + 2 * SEASON:
+        methods = [sel.method for sel in select_methods(y, counts, threshold)]
+    elif np.isinf(threshold):
+        # Historique trop court pour le holdout : pas de sélection
+        methods = [None] * len(series)
+    else:
+        return {}
+    if np.isinf(threshold):
+        # Mode "tout rapide" (jamais de SARIMA) : séries sans méthode -> moyenne saisonnière,
+        # dérive s'il n'y a pas une saison complète
+        fallback = "seasonal_mean" if y.shape[1] >= SEASON else "drift"
+        methods = [m or fallback for m in methods]
+    preds = forecast_target(y, counts, last, methods, year)
+
+    n_value = len(eligible)
+    crise_pos = {i: n_value + j for j, i in enumerate(crise_rows)}
+    out = {}
+    for j, i in enumerate(eligible):
+        key, unite, ts_value, ts_crise = items[i]
+        c = crise_pos.get(i)
+        if methods[j] is None or (c is not None and methods[c] is None):
+            continue
+        pred_value = pd.Series(preds[j], index=dates)
+        if c is not None:
+            pred_crise = pd.Series(preds[c], index=dates)
+        elif joint:
+            pred_crise = seasonal_ratio_forecast(ts_crise, ts_value, pred_value)
+        else:
+            pred_crise = ratio_forecast(ts_crise, ts_value, pred_value)
+        out[i] = (methods[j], forecast_rows(key, unite, ts_value, ts_crise, pred_value, pred_crise))
+    return out
@@ -0,0 +1,147 @@
+# forecasting/orders.py — choix automatique des ordres SARIMA par série
+"""
+Recherche des ordres (p,d,q)(P,D,Q,12) d'une série :
+
+1. différenciations : d par tests ADF successifs, D par la force de la saisonnalité (STL) ;
+2. grille bornée sur (p,q,P,Q), parcourue par complexité croissante (p+q+P+Q) ; la recherche
+   s'arrête dès qu'un niveau n'améliore plus l'AIC d'au moins PLATEAU_DELTA.
+
+Les résultats (tests et ordres retenus) sont mis en cache avec l'empreinte de la série dans le
+store des modèles : une série inchangée ne refait ni les tests ni la recherche.
+"""
+
+import itertools
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.seasonal import STL
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.stattools import adfuller
+
+from forecasting.store import load_entry, save_entry, series_hash
+
+
+SEASON = 12
+
+# Bornes de la grille
+MAX_P = MAX_Q = 2
+MAX_SEASONAL_P = MAX_SEASONAL_Q = 1
+MAX_D = 2
+
+# Seuils : p-value ADF, force de saisonnalité pour D=1, gain d'AIC minimal entre deux niveaux
+ADF_ALPHA = 0.05
+SEASONAL_STRENGTH = 0.64
+PLATEAU_DELTA = 2.0
+
+# Itérations de l'optimiseur pendant la recherche (l'ajustement final reste complet)
+SEARCH_MAXITER = 50
+
+
+def format_order(order, seasonal_order) -> str:
+    """Ordres au format (p,d,q)(P,D,Q,s)."""
+    return f"({','.join(map(str, order))})({','.join(map(str, seasonal_order))})"
+
+
+def differencing_order(ts: pd.Series) -> int:
+    """Plus petit d (0..MAX_D) pour lequel la série différenciée d fois est stationnaire (ADF)."""
+    values = ts.to_numpy(dtype="float64")
+    for d in range(MAX_D + 1):
+        x = np.diff(values, n=d) if d else values
+        if len(x) < 10 or np.ptp(x) == 0:
+            return d
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                p_value = adfuller(x, autolag="AIC")[1]
+        except (ValueError, np.linalg.LinAlgError):
+            return d
+        if p_value < ADF_ALPHA:
+            return d
+    return MAX_D
+
+
+def seasonal_differencing_order(ts: pd.Series) -> int:
+    """D=1 si la saisonnalité est forte (1 - var(résidu) / var(saison + résidu) >= SEASONAL_STRENGTH)."""
+    if len(ts) < 2 * SEASON + 1 or np.ptp(ts.to_numpy(dtype="float64")) == 0:
+        return 0
+    res = STL(ts, period=SEASON, robust=True).fit()
+    detrended = res.seasonal + res.resid
+    if np.var(detrended) == 0:
+        return 0
+    strength = max(0.0, 1.0 - np.var(res.resid) / np.var(detrended))
+    return int(strength >= SEASONAL_STRENGTH)
+
+
+def candidate_levels():
+    """Grille (p,q,P,Q) regroupée par complexité croissante."""
+    grid = itertools.product(range(MAX_P + 1), range(MAX_Q + 1),
+                             range(MAX_SEASONAL_P + 1), range(MAX_SEASONAL_Q + 1))
+    levels = {}
+    for p, q, sp, sq in grid:
+        levels.setdefault(p + q + sp + sq, []).append((p, q, sp, sq))
+    return [levels[k] for k in sorted(levels)]
+
+
+def _aic(ts: pd.Series, order, seasonal_order) -> float:
+    try:
+        model = SARIMAX(ts, order=order, seasonal_order=seasonal_order,
+                        enforce_stationarity=False, enforce_invertibility=False)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            aic = model.fit(disp=False, maxiter=SEARCH_MAXITER).aic
+    except Exception:
+        return np.inf
+    return float(aic) if np.isfinite(aic) else np.inf
+
+
+def search_orders(ts: pd.Series, d: int, seasonal_d: int) -> tuple:
+    """
+    Parcours de la grille par niveaux de complexité, arrêt au plateau d'AIC.
+
+    Returns:
+        (order, seasonal_order, aic)
+    """
+    best = ((0, d, 0), (0, seasonal_d, 0, SEASON), np.inf)
+    for level in candidate_levels():
+        level_best = best
+        for p, q, sp, sq in level:
+            order, seasonal_order = (p, d, q), (sp, seasonal_d, sq, SEASON)
+            aic = _aic(ts, order, seasonal_order)
+            if aic < level_best[2]:
+                level_best = (order, seasonal_order, aic)
+        improved = best[2] - level_best[2]
+        best = level_best if improved > 0 else best
+        if np.isfinite(improved) and improved < PLATEAU_DELTA:
+            break
+    return best
+
+
+def select_order(ts: pd.Series, cache=None) -> tuple:
+    """
+    Ordres SARIMA d'une série préparée (fréquence mensuelle, sans trous).
+
+    Args:
+        ts: série préparée (voir sarima.prepare_series)
+        cache: ModelCache de la recherche (voir store.model_cache), None sans cache
+
+    Returns:
+        (order, seasonal_order)
+    """
+    digest = series_hash(ts)
+    entry = load_entry(cache.path) if cache is not None else None
+    if entry is not None and entry.get("series_hash") == digest and not cache.refit:
+        return tuple(entry["order"]), tuple(entry["seasonal_order"])
+
+    d = differencing_order(ts)
+    seasonal_d = seasonal_differencing_order(ts)
+    order, seasonal_order, aic = search_orders(ts, d, seasonal_d)
+    if cache is not None:
+        save_entry(cache.path, {
+            "series_hash": digest,
+            "tests": {"d": d, "D": seasonal_d},
+            "order": list(order),
+            "seasonal_order": list(seasonal_order),
+            "aic": aic if np.isfinite(aic) else None,
+        })
+    return order, seasonal_order
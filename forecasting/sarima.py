@@ -0,0 +1,254 @@
+# forecasting/sarima.py — prévision SARIMA d'une série mensuelle (repris de scripts/prevision.ipynb)
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from forecasting.orders import format_order, select_order
+from forecasting.store import fit_cached, model_cache
+
+
+# Ordres par défaut (série mensuelle, saisonnalité annuelle)
+ORDER = (1, 1, 1)
+SEASONAL_ORDER = (1, 1, 1, 12)
+
+# Seuil au-delà duquel la prévision est considérée comme explosive (instabilité SARIMA)
+MAX_FORECAST_MAGNITUDE = 1e10
+
+# Nombre minimal de points pour modéliser une série
+MIN_POINTS = 18
+
+
+def silence_statsmodels_warnings():
+    """Réduit le bruit des warnings statsmodels (séries courtes, convergence)."""
+    warnings.filterwarnings("ignore", category=UserWarning, module="statsmodels")
+    warnings.filterwarnings("ignore", message=".*Maximum Likelihood optimization failed to converge.*")
+    warnings.filterwarnings("ignore", message=".*Too few observations.*", module="statsmodels")
+    warnings.filterwarnings("ignore", category=Warning, module="statsmodels.base.model")
+
+
+def target_range(year: int):
+    """Premier et dernier mois (début de mois) de l'année à prévoir."""
+    return pd.Timestamp(f"{year}-01-01"), pd.Timestamp(f"{year}-12-01")
+
+
+def prepare_series(ts: pd.Series) -> pd.Series:
+    """Préparation commune : fréquence mensuelle + remplissage des trous pour SARIMA."""
+    ts = ts.sort_index().asfreq("MS")
+    ts = ts.interpolate("time").ffill().bfill()
+    return ts
+
+
+def fallback_seasonal_naive(ts: pd.Series, target_start, target_end) -> pd.Series:
+    """Prévision de repli : pour chaque mois cible, moyenne des mêmes mois dans l'historique."""
+    months = pd.date_range(start=target_start, end=target_end, freq="MS")
+    out = {}
+    for d in months:
+        same_month = ts[ts.index.month == d.month]
+        out[d] = same_month.mean() if len(same_month) > 0 else ts.mean()
+    return pd.Series(out)
+
+
+def is_forecast_sane(pred) -> bool:
+    """Vérifie que la prévision ne contient pas de valeurs explosives ou non finies."""
+    if pred is None or len(pred) == 0:
+        return False
+    if not np.isfinite(pred).all():
+        return False
+    if pred.abs().max() > MAX_FORECAST_MAGNITUDE:
+        return False
+    return True
+
+
+def forecast_year(ts: pd.Series, year: int, order=ORDER, seasonal_order=SEASONAL_ORDER, cache=None):
+    """
+    Prévision SARIMA des 12 mois de `year`.
+
+    Args:
+        ts: série mensuelle (index datetime) avec valeurs historiques
+        year: année à prévoir
+        order, seasonal_order: ordres SARIMA
+        cache: ModelCache du modèle (voir forecasting.store), None sans cache
+
+    Returns:
+        (prévision, intervalle de confiance) restreints aux mois de `year`
+    """
+    target_start, target_end = target_range(year)
+
+    # 1) Fréquence mensuelle + imputation simple pour stabiliser SARIMA
+    ts = prepare_series(ts)
+
+    last_obs = ts.index.max()
+
+    # 2) Si la série couvre déjà l'année cible : prédiction in-sample, sinon forecast jusqu'à target_end
+    if last_obs >= target_end:
+        steps = 0
+    else:
+        steps = (pd.Period(target_end, "M") - pd.Period(last_obs, "M")).n + 1
+
+    model = SARIMAX(
+        ts,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=False,
+        enforce_invertibility=False,
+    )
+    fit, _ = fit_cached(model, ts, cache)
+
+    # 3) Prédictions jusqu'à target_end
+    if steps > 0:
+        fc = fit.get_forecast(steps=steps)
+        pred = fc.predicted_mean
+        conf = fc.conf_int()
+    else:
+        pred_res = fit.get_prediction(start=target_start, end=target_end)
+        pred = pred_res.predicted_mean
+        conf = pred_res.conf_int()
+
+    # 4) Garder uniquement l'année cible
+    pred_year = pred.loc[target_start:target_end]
+    conf_year = conf.loc[target_start:target_end]
+
+    # 5) Prévision explosive (instabilité SARIMA) : remplacement par le repli saisonnier
+    if not is_forecast_sane(pred_year):
+        pred_year = fallback_seasonal_naive(ts, target_start, target_end)
+        conf_year = pd.DataFrame({"lower": pred_year - pred_year.std(), "upper": pred_year + pred_year.std()})
+
+    return pred_year, conf_year
+
+
+def forecast_or_ratio(ts_crise_raw, ts_value_raw, pred_value, year: int, min_points=MIN_POINTS, cache=None,
+                      order=ORDER, seasonal_order=SEASONAL_ORDER):
+    """
+    Prévision value_crise : SARIMA si assez de points valides, sinon ratio historique (value_crise/value).
+    Garantit toujours une sortie sans NaN.
+    """
+    n_valid = ts_crise_raw.notna().sum()
+    if n_valid >= min_points:
+        try:
+            pred_crise, _ = forecast_year(ts_crise_raw.copy(), year, order, seasonal_order, cache=cache)
+            return pred_crise
+        except Exception:
+            pass
+    return ratio_forecast(ts_crise_raw, ts_value_raw, pred_value)
+
+
+def ratio_forecast(ts_crise_raw, ts_value_raw, pred_value):
+    """Repli value_crise : ratio historique moyen (value_crise / value) appliqué à la prévision value."""
+    safe_value = ts_value_raw.replace(0, np.nan)
+    ratio_series = ts_crise_raw / safe_value
+    ratio = ratio_series.replace([np.inf, -np.inf], np.nan).dropna().mean()
+    if pd.isna(ratio) or ratio < 0:
+        ratio = 0.0
+    return pred_value * ratio
+
+
+def seasonal_ratio_forecast(ts_crise_raw, ts_value_raw, pred_value):
+    """
+    Prévision conjointe value_crise : profil mensuel du ratio value_crise / value (moyenne par mois
+    calendaire, moyenne globale pour les mois absents) appliqué à la prévision value.
+    """
+    safe_value = ts_value_raw.replace(0, np.nan)
+    ratio = (ts_crise_raw / safe_value).replace([np.inf, -np.inf], np.nan).dropna()
+    if ratio.empty:
+        return ratio_forecast(ts_crise_raw, ts_value_raw, pred_value)
+    by_month = ratio.groupby(ratio.index.month).mean()
+    factors = pd.Series(pred_value.index.month, index=pred_value.index).map(by_month).fillna(ratio.mean())
+    return pred_value * factors.clip(lower=0.0)
+
+
+def crise_forecast(ts_crise_raw, ts_value_raw, pred_value, year: int, min_points=MIN_POINTS, joint=False,
+                   cache=None, order=ORDER, seasonal_order=SEASONAL_ORDER):
+    """value_crise : profil de ratio (joint, sans ajustement) ou SARIMA séparé / ratio moyen (notebooks)."""
+    if joint:
+        return seasonal_ratio_forecast(ts_crise_raw, ts_value_raw, pred_value)
+    return forecast_or_ratio(ts_crise_raw, ts_value_raw, pred_value, year, min_points=min_points,
+                             cache=cache, order=order, seasonal_order=seasonal_order)
+
+
+def clip_bounds(ts: pd.Series, margin: float = 0.5, floor=None):
+    """Bornes raisonnables tirées de l'historique (évite toute valeur explosive résiduelle)."""
+    lo, hi = ts.min(), ts.max()
+    lo, hi = lo - margin * (hi - lo), hi + margin * (hi - lo)
+    if floor is not None:
+        lo = max(floor, lo)
+    return lo, hi
+
+
+def forecast_rows(key: tuple, unite, ts_value: pd.Series, ts_crise: pd.Series, pred_value, pred_crise,
+                  order: str = None) -> list:
+    """Lignes de sortie (format des CSV mensuels) pour une série prévue ; `order` : ordres SARIMA retenus."""
+    site_code, indicateur, sous_ind = key
+    v_lo, v_hi = clip_bounds(ts_value)
+    c_lo, c_hi = clip_bounds(ts_crise, floor=0)
+    rows = []
+    for date in pred_value.index:
+        val = pred_value.loc[date]
+        cri = pred_crise.loc[date] if date in pred_crise.index else (pred_value.loc[date] * 0.0)
+        if pd.isna(cri):
+            cri = 0.0
+        val = np.clip(float(val), v_lo, v_hi)
+        cri = np.clip(float(cri), c_lo, c_hi)
+        rows.append({
+            "year": date.year,
+            "month": date.month,
+            "site_code": site_code,
+            "indicateur": indicateur,
+            "sous_indicateur": sous_ind,
+            "unite": unite,
+            "value": round(val, 2),
+            "value_crise": round(cri, 2),
+        })
+        if order is not None:
+            rows[-1]["order"] = order
+    return rows
+
+
+def forecast_series(key: tuple, unite, ts_value: pd.Series, ts_crise: pd.Series, year: int, min_points=MIN_POINTS,
+                    store=None, joint=False, order_search=False) -> list:
+    """
+    Prévision value + value_crise d'une série (site_code, indicateur, sous_indicateur).
+
+    Args:
+        store: ModelStore (cache des modèles ajustés) ou None
+        joint: value_crise déduite de la prévision value par le profil de ratio (un seul ajustement)
+        order_search: ordres choisis par série (voir forecasting.orders) au lieu de ORDER / SEASONAL_ORDER
+
+    Returns:
+        liste de lignes au format des CSV mensuels (vide si trop peu de points)
+    """
+    if len(ts_value) < min_points:
+        return []
+    ts_value_prep = prepare_series(ts_value.copy())
+    order, seasonal_order = ORDER, SEASONAL_ORDER
+    if order_search:
+        order, seasonal_order = select_order(ts_value_prep, model_cache(store, key, "order_search", (), ()))
+    value_cache = model_cache(store, key, "value", order, seasonal_order)
+    crise_cache = model_cache(store, key, "value_crise", order, seasonal_order)
+    # Prévision value (toujours SARIMA)
+    pred_value, _ = forecast_year(ts_value_prep, year, order, seasonal_order, cache=value_cache)
+    # Prévision value_crise : profil de ratio (joint), sinon SARIMA si assez de points ou ratio moyen
+    pred_crise = crise_forecast(ts_crise, ts_value, pred_value, year, min_points=min_points, joint=joint,
+                                cache=crise_cache, order=order, seasonal_order=seasonal_order)
+    return forecast_rows(key, unite, ts_value, ts_crise, pred_value, pred_crise,
+                         order=format_order(order, seasonal_order) if order_search else None)
+
+
+def fallback_series(key: tuple, unite, ts_value: pd.Series, ts_crise: pd.Series, year: int,
+                    min_points=MIN_POINTS, joint=False) -> list:
+    """
+    Prévision de repli d'une série sans ajustement (moyenne des mêmes mois de l'historique),
+    utilisée quand l'ajustement SARIMA dépasse son temps.
+    """
+    if len(ts_value) < min_points:
+        return []
+    target_start, target_end = target_range(year)
+    pred_value = fallback_seasonal_naive(prepare_series(ts_value.copy()), target_start, target_end)
+    if joint:
+        pred_crise = seasonal_ratio_forecast(ts_crise, ts_value, pred_value)
+    elif ts_crise.notna().sum() >= min_points:
+        pred_crise = fallback_seasonal_naive(prepare_series(ts_crise.copy()), target_start, target_end)
+    else:
+        pred_crise = ratio_forecast(ts_crise, ts_value, pred_value)
+    return forecast_rows(key, unite, ts_value, ts_crise, pred_value, pred_crise)
@@ -0,0 +1,152 @@
+# forecasting/store.py — cache disque des modèles SARIMA ajustés (paramètres par série)
+"""
+Un fichier JSON par (domaine, site_code, indicateur, sous_indicateur, colonne, ordres) :
+paramètres ajustés + empreinte de la série d'entrée.
+
+- série inchangée : les paramètres sont réutilisés tels quels (lissage seul, sans optimisation)
+- nouveaux mois ajoutés en fin de série : mise à jour incrémentale, le filtre avance sur les
+  nouvelles observations avec les paramètres stockés (pas de ré-estimation), sauf si
+  REFIT_EVERY mois ont été ajoutés depuis la dernière estimation ou si la dérive est trop forte
+- autre modification : nouvel ajustement démarré depuis les paramètres stockés (warm start)
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+STORE_DIR = os.path.join(".cache", "forecast_models")
+
+# Emplacement du cache pour un domaine (transmis tel quel aux processus de calcul) ;
+# refit=True force la ré-estimation de tous les modèles (les paramètres stockés servent de départ)
+ModelStore = namedtuple("ModelStore", ["root", "domain", "refit"], defaults=(False,))
+
+# Cache d'un modèle : fichier + ré-estimation forcée
+ModelCache = namedtuple("ModelCache", ["path", "refit"])
+
+# Statuts d'ajustement
+FIT_REUSED = "reused"
+FIT_UPDATED = "updated"
+FIT_WARM = "warm"
+FIT_COLD = "fitted"
+
+# Ré-estimation planifiée : nombre de mois ajoutés depuis la dernière estimation
+REFIT_EVERY = 12
+
+# Dérive : moyenne des erreurs de prévision standardisées (|z|) sur les nouveaux mois
+DRIFT_THRESHOLD = 2.0
+
+
+def series_hash(ts: pd.Series) -> str:
+    """Empreinte d'une série (dates + valeurs) telle qu'elle est passée au modèle."""
+    h = hashlib.sha256()
+    h.update(np.asarray(ts.index.asi8, dtype="int64").tobytes())
+    h.update(np.asarray(ts.to_numpy(dtype="float64", na_value=np.nan)).tobytes())
+    return h.hexdigest()
+
+
+def entry_path(store: ModelStore, key: tuple, column: str, order, seasonal_order) -> str:
+    """Chemin du fichier de cache d'un modèle."""
+    ident = json.dumps([*map(str, key), column, list(order), list(seasonal_order)], ensure_ascii=False)
+    name = hashlib.sha1(ident.encode("utf-8")).hexdigest()
+    return os.path.join(store.root, store.domain, f"{name}.json")
+
+
+def model_cache(store: ModelStore, key: tuple, column: str, order, seasonal_order):
+    """ModelCache d'un modèle, ou None sans store."""
+    if store is None:
+        return None
+    return ModelCache(entry_path(store, key, column, order, seasonal_order), store.refit)
+
+
+def load_entry(path: str):
+    """Entrée de cache (dict) ou None si absente / illisible."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_entry(path: str, entry: dict) -> None:
+    """Écrit une entrée de cache (remplacement atomique : sûr entre processus)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def has_drifted(fit, start: int, threshold: float = DRIFT_THRESHOLD) -> bool:
+    """Vrai si les erreurs de prévision à un pas des observations `start:` sont anormalement grandes."""
+    errors = np.asarray(fit.standardized_forecasts_error)[0, start:]
+    errors = errors[np.isfinite(errors)]
+    return len(errors) > 0 and float(np.abs(errors).mean()) > threshold
+
+
+def _appended(entry: dict, ts: pd.Series) -> int:
+    """Nombre de mois ajoutés en fin de série depuis l'entrée (0 si l'historique a changé)."""
+    n_old = entry.get("nobs") or 0
+    if not 0 < n_old < len(ts):
+        return 0
+    if series_hash(ts.iloc[:n_old]) != entry.get("series_hash"):
+        return 0
+    return len(ts) - n_old
+
+
+def fit_cached(model, ts: pd.Series, cache=None):
+    """
+    Ajuste `model` en réutilisant le cache disque quand c'est possible.
+
+    Args:
+        model: modèle SARIMAX construit sur `ts`
+        ts: série d'entrée (sert à l'empreinte)
+        cache: ModelCache (None : ajustement classique, sans cache)
+
+    Returns:
+        (résultat ajusté, statut parmi FIT_REUSED / FIT_UPDATED / FIT_WARM / FIT_COLD)
+    """
+    if cache is None:
+        return model.fit(disp=False), FIT_COLD
+
+    digest = series_hash(ts)
+    entry = load_entry(cache.path)
+    params = None
+    if entry is not None and entry.get("param_names") == list(model.param_names):
+        params = np.asarray(entry["params"], dtype="float64")
+        if not np.isfinite(params).all():
+            params = None
+    if params is not None and not cache.refit:
+        if entry.get("series_hash") == digest:
+            return model.smooth(params), FIT_REUSED
+
+        # Nouveaux mois en fin de série : filtrage avec les paramètres stockés, sans ré-estimation
+        added = _appended(entry, ts)
+        since_fit = entry.get("appended", 0) + added
+        if added and since_fit < REFIT_EVERY:
+            fit = model.smooth(params)
+            if not has_drifted(fit, len(ts) - added):
+                save_entry(cache.path, {**entry, "series_hash": digest, "nobs": len(ts), "appended": since_fit})
+                return fit, FIT_UPDATED
+
+    if params is not None:
+        fit, status = model.fit(start_params=params, disp=False), FIT_WARM
+    else:
+        fit, status = model.fit(disp=False), FIT_COLD
+
+    save_entry(cache.path, {
+        "series_hash": digest,
+        "param_names": list(model.param_names),
+        "params": [float(p) for p in np.asarray(fit.params)],
+        "nobs": int(fit.nobs),
+        "appended": 0,
+        "llf": float(fit.llf) if np.isfinite(fit.llf) else None,
+    })
+    return fit, status
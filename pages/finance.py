@@ -4,7 +4,18 @@ import pandas as pd
 import numpy as np
 import altair as alt
 
-from utils import load_data
+from utils import (
+    load_cube,
+    cube_lookup,
+    filter_years,
+    visible_series,
+    series_frame,
+    unit_frame,
+    chart_frame,
+    indicator_table,
+    page_count,
+    table_page,
+)
 
 # Couleur dédiée pour l'année 2017 (prévision)
 COULEUR_2017 = "#E67E22"  # Orange
@@ -20,6 +31,19 @@ PALETTE_ANNEES = [
     "#6C757D",  # Gris technique
 ]
 
+def _line_chart(data, unite, color):
+    """Courbe mensuelle (mois en abscisse) d'une ou plusieurs séries."""
+    return (
+        alt.Chart(data)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("month:O", title="Mois"),
+            y=alt.Y("value:Q", title=f"Volume mensuel ({unite})", axis=alt.Axis(format=",.2f")),
+            color=color,
+        )
+    )
+
+
 def render(
     st_module,
     *,
@@ -30,149 +54,115 @@ def render(
     crise_col,
     years,
     show_forecast=False,
+    facet_charts=False,
     **kwargs,
 ):
     if not data_path:
         st_module.info("Aucune donnée configurée pour cette page.")
         return
     try:
-        df = load_data(data_path)
+        cube = load_cube(data_path)
     except Exception as e:
         st_module.error(f"Impossible de charger les données : {e}")
         return
 
-    # Choix de la colonne de valeur selon le mode (Normal / Crise)
-    value_col = "value"
-    if mode_choice == "Crise" and "value_crise" in df.columns:
-        value_col = "value_crise"
-
-    # Filtre site / total (colonne `site_code`)
+    # Site (PLF, CFX ou TOTAL = PLF + CFX) et mode (Normal / Crise) : lecture dans le cube pré-agrégé
     hospital_choice = kwargs.get("hospital_choice", "TOTAL")
-    if "site_code" in df.columns:
-        if hospital_choice in ("PLF", "CFX"):
-            df = df[df["site_code"] == hospital_choice]
-        # TOTAL => on garde PLF + CFX
+    monthly, yearly = cube_lookup(cube, hospital_choice, mode_choice)
 
     # Filtre année (données mensuelles : year)
-    dff = df.copy()
-    year_col = "ANNEE" if "ANNEE" in dff.columns else "year"
-    if year_choice != "Toutes" and year_col in dff.columns:
-        dff[year_col] = dff[year_col].astype(int)
-        dff = dff[dff[year_col] == int(year_choice)]
     # Par défaut les données 2017 sont masquées ; la case « Afficher prévision 2017 » les active
-    if not show_forecast and year_col in dff.columns:
-        dff = dff[dff[year_col].astype(int) != 2017]
-    has_2017 = year_col in df.columns and (df[year_col].astype(int) == 2017).any()
-
-    # Colonnes attendues (CSV mensuel)
-    required_cols = {"indicateur", "sous_indicateur", "unite", value_col}
-    if not required_cols.issubset(dff.columns):
-        st_module.error(
-            f"Le CSV ne contient pas les colonnes attendues ({', '.join(sorted(required_cols))})."
-        )
+    shown_years = filter_years(cube["years"].get(hospital_choice, []), year_choice, show_forecast)
+    has_2017 = 2017 in cube["years"].get(hospital_choice, [])
+
+    # Séries (indicateur / unité / sous-indicateur) ayant des données sur ces années,
+    # avec leur position dans les tables du cube : pas de masque par niveau d'imbrication
+    tree = visible_series(cube, hospital_choice, shown_years)
+
+    indicateurs = list(tree)
+    page_key = kwargs.get("page_name", "")
+    if not indicateurs:
+        st_module.info("Aucune donnée pour ces filtres.")
         return
 
-    indicateurs = sorted(dff["indicateur"].dropna().unique().tolist())
-    tabs = st_module.tabs(indicateurs)
-
-    for tab, indic in zip(tabs, indicateurs):
-        with tab:
-            st_module.subheader(indic)
-            df_indic = dff[dff["indicateur"] == indic]
-            unites = sorted(df_indic["unite"].dropna().unique().tolist())
-
-            multi_year = year_choice == "Toutes"
-
-            for unite in unites:
-                df_u = df_indic[df_indic["unite"] == unite]
-                sous_labels = sorted(df_u["sous_indicateur"].dropna().unique().tolist())
-
-                for sous in sous_labels:
-                    df_s = df_u[df_u["sous_indicateur"] == sous]
-                    subtitle = f"{sous} ({unite})"
-                    mode_label = "Situation normale" if mode_choice == "Normal" else "Crise (simulation)"
-
-                    # 1) Toutes les années -> courbes mensuelles par année
-                    if multi_year:
-                        if not {"year", "month"}.issubset(df_s.columns):
-                            continue
-                        agg = (
-                            df_s.groupby(["year", "month"])[value_col]
-                            .sum()
-                            .reset_index()
-                            .rename(columns={value_col: "value"})
-                        )
-                        agg["year"] = agg["year"].astype(int)
-                        agg["month"] = agg["month"].astype(int)
-
-                        # 2017 en orange (déjà inclus dans le CSV logistique)
-                        color_range = [COULEUR_2017 if y == 2017 else PALETTE_ANNEES[i % len(PALETTE_ANNEES)] for i, y in enumerate(years)]
-                        chart_obj = (
-                            alt.Chart(agg)
-                            .mark_line(point=True)
-                            .encode(
-                                x=alt.X("month:O", title="Mois"),
-                                y=alt.Y("value:Q", title=f"Volume mensuel ({unite})", axis=alt.Axis(format=",.2f")),
-                                color=alt.Color("year:O", title="Année", scale=alt.Scale(domain=years, range=color_range)),
-                            )
-                        )
-
-                        sub = f"{subtitle} — profil mensuel multi-années ({mode_label})"
-                        if has_2017 and multi_year:
-                            sub += " — 2017 = prévision SARIMA"
-
-                    # 2) Une seule année -> profil mensuel de l'année
-                    else:
-                        if "month" not in df_s.columns:
-                            continue
-                        agg = (
-                            df_s.groupby("month")[value_col]
-                            .sum()
-                            .reset_index()
-                            .rename(columns={value_col: "value"})
-                        )
-                        agg["month"] = agg["month"].astype(int)
-                        # Couleur : orange pour 2017 (prévision), sinon palette
-                        color_annee = COULEUR_2017 if int(year_choice) == 2017 else (PALETTE_ANNEES[years.index(int(year_choice)) % len(PALETTE_ANNEES)] if int(year_choice) in years else PALETTE_ANNEES[0])
-                        chart_obj = (
-                            alt.Chart(agg)
-                            .mark_line(point=True)
-                            .encode(
-                                x=alt.X("month:O", title="Mois"),
-                                y=alt.Y("value:Q", title=f"Volume mensuel ({unite})", axis=alt.Axis(format=",.2f")),
-                                color=alt.value(color_annee),
-                            )
-                        )
-
-                        sub = f"{subtitle} — profil mensuel {year_choice} ({mode_label})"
-                        if has_2017 and int(year_choice) == 2017:
-                            sub += " (prévision SARIMA)"
-
-
-                    chart = chart_obj.properties(
-                        title={"text": indic, "subtitle": sub},
-                        height=350,
-                    )
-
-                    st_module.altair_chart(chart, use_container_width=True)
-                    st_module.markdown("<div style='margin-bottom: 3.5rem;'></div>", unsafe_allow_html=True)
-
-            # Tableau détaillé annuel par sous-indicateur / année
-            with st_module.expander("Voir le détail (tableau)"):
-                table = (
-                    df_indic
-                    .groupby(["year", "unite", "sous_indicateur"])[value_col]
-                    .sum()
-                    .reset_index()
-                    .rename(columns={
-                        "year": "ANNEE",
-                        "unite": "UNITE",
-                        "sous_indicateur": "SOUS-INDICATEUR",
-                        value_col: "Valeur annuelle",
-                    })
-                )
-                cols = ["ANNEE", "UNITE", "SOUS-INDICATEUR", "Valeur annuelle"]
-                st_module.dataframe(
-                    table[cols].sort_values(["UNITE", "SOUS-INDICATEUR", "ANNEE"]),
-                    use_container_width=True,
-                )
+    # Navigation par indicateur : seul l'indicateur sélectionné est calculé et envoyé
+    # au navigateur (st.tabs construisait et sérialisait tous les onglets à chaque rerun)
+    indic = st_module.radio(
+        "Indicateur",
+        options=indicateurs,
+        horizontal=True,
+        label_visibility="collapsed",
+        key=f"indicateur_{page_key}",
+    )
+
+    st_module.subheader(indic)
+
+    multi_year = year_choice == "Toutes"
+    mode_label = "Situation normale" if mode_choice == "Normal" else "Crise (simulation)"
+
+    # 1) Toutes les années -> courbes mensuelles par année
+    if multi_year:
+        # 2017 en orange (déjà inclus dans le CSV logistique)
+        color_range = [COULEUR_2017 if y == 2017 else PALETTE_ANNEES[i % len(PALETTE_ANNEES)] for i, y in enumerate(years)]
+        color = alt.Color("year:O", title="Année", scale=alt.Scale(domain=years, range=color_range))
+        fields = ["year", "month", "value"]
+        profile = "profil mensuel multi-années"
+        forecast_note = " — 2017 = prévision SARIMA" if has_2017 else ""
+
+    # 2) Une seule année -> profil mensuel de l'année
+    else:
+        # Couleur : orange pour 2017 (prévision), sinon palette
+        color_annee = COULEUR_2017 if int(year_choice) == 2017 else (PALETTE_ANNEES[years.index(int(year_choice)) % len(PALETTE_ANNEES)] if int(year_choice) in years else PALETTE_ANNEES[0])
+        color = alt.value(color_annee)
+        fields = ["month", "value"]
+        profile = f"profil mensuel {year_choice}"
+        forecast_note = " (prévision SARIMA)" if has_2017 and int(year_choice) == 2017 else ""
+
+    for unite, sous_parts in tree[indic].items():
+        if facet_charts:
+            # Petits multiples : une seule figure et un seul jeu de données pour tous les
+            # sous-indicateurs de l'unité (au lieu d'un graphique + un espaceur par sous-indicateur)
+            df_u = unit_frame(monthly, sous_parts, shown_years)
+            chart = (
+                _line_chart(chart_frame(df_u, ["sous_indicateur"] + fields), unite, color)
+                .properties(height=220)
+                .facet(facet=alt.Facet("sous_indicateur:N", title=None), columns=2)
+                .resolve_scale(y="independent")
+                .properties(title={"text": indic, "subtitle": f"{unite} — {profile} ({mode_label}){forecast_note}"})
+            )
+            st_module.altair_chart(chart, use_container_width=True)
+            continue
+
+        for sous, part in sous_parts.items():
+            df_s = series_frame(monthly, part.monthly, shown_years)
+            # Déjà agrégé par (year, month) dans le cube
+            chart = _line_chart(chart_frame(df_s, fields), unite, color).properties(
+                title={"text": indic, "subtitle": f"{sous} ({unite}) — {profile} ({mode_label}){forecast_note}"},
+                height=350,
+            )
+
+            st_module.altair_chart(chart, use_container_width=True)
+            st_module.markdown("<div style='margin-bottom: 3.5rem;'></div>", unsafe_allow_html=True)
+
+    # Tableau détaillé annuel par sous-indicateur / année : construit et envoyé seulement
+    # quand l'utilisateur l'ouvre (un expander exécute son contenu même fermé).
+    # Fragment : ouvrir le tableau ou changer de page ne redessine pas les graphiques.
+    @st_module.fragment
+    def detail_table():
+        if st_module.toggle("Voir le détail (tableau)", key=f"detail_{page_key}"):
+            # Cumuls annuels pré-calculés par (site, mode), déjà triés par unité / sous-indicateur / année
+            table = indicator_table(yearly, tree[indic], shown_years).rename(columns={
+                "year": "ANNEE",
+                "unite": "UNITE",
+                "sous_indicateur": "SOUS-INDICATEUR",
+                "value": "Valeur annuelle",
+            })
+            cols = ["ANNEE", "UNITE", "SOUS-INDICATEUR", "Valeur annuelle"]
+            n_pages = page_count(len(table))
+            page = 1
+            if n_pages > 1:
+                page = st_module.number_input("Page", min_value=1, max_value=n_pages, value=1, key=f"detail_page_{page_key}")
+                st_module.caption(f"{len(table)} lignes — page {page} / {n_pages}")
+            st_module.dataframe(table_page(table[cols], page), use_container_width=True)
+
+    detail_table()
@@ -0,0 +1 @@
+# pipeline — génération des jeux de données dérivés (annuel -> mensuel) sans notebooks
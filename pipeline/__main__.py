@@ -0,0 +1,53 @@
+# pipeline/__main__.py — ligne de commande : python -m pipeline --domain all
+import argparse
+
+from forecasting.batch import DOMAINS, METHOD_CHOICES
+from forecasting.deadline import SERIES_TIMEOUT
+from forecasting.store import STORE_DIR
+from pipeline.stages import STAGES, run
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline",
+        description="Reconstruit les jeux de données (brut -> interpolé -> crise -> mensuel -> prévisions -> all), "
+                    "un processus par domaine.",
+    )
+    parser.add_argument("--domain", nargs="+", default=["all"], choices=["all", *DOMAINS],
+                        help="domaine(s) à reconstruire (défaut : all)")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES,
+                        help="étapes à exécuter (défaut : toutes, dans l'ordre)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="domaines traités en parallèle (défaut : nombre de cœurs ; 1 = séquentiel)")
+    parser.add_argument("--year", type=int, default=2017, help="année à prévoir (défaut : 2017)")
+    parser.add_argument("--method", default="auto", choices=METHOD_CHOICES,
+                        help="méthode de prévision (voir python -m forecasting --help)")
+    parser.add_argument("--crise", default="joint", choices=["joint", "separate"],
+                        help="value_crise : profil de ratio appliqué à value (défaut) ou second modèle "
+                             "(separate, comme les notebooks)")
+    parser.add_argument("--forecast-workers", type=int, default=1,
+                        help="processus SARIMA par domaine (défaut : 1)")
+    parser.add_argument("--series-timeout", type=float, default=SERIES_TIMEOUT,
+                        help=f"durée maximale d'un ajustement SARIMA en secondes, 0 = sans limite "
+                             f"(défaut : {SERIES_TIMEOUT:g})")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="durée maximale des prévisions de tous les domaines en secondes")
+    parser.add_argument("--store", default=STORE_DIR,
+                        help=f"dossier du cache des modèles ajustés (défaut : {STORE_DIR})")
+    parser.add_argument("--no-store", action="store_true", help="réajuste tous les modèles, sans cache")
+    parser.add_argument("--force", action="store_true",
+                        help="recalcule toutes les étapes demandées, même à jour (défaut : seulement les groupes "
+                             "dont les entrées ont changé)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    domains = DOMAINS if "all" in args.domain else args.domain
+    run(domains, stages=args.stages, workers=args.workers, budget=args.budget, force=args.force, year=args.year,
+        method=args.method, joint=args.crise == "joint", forecast_workers=args.forecast_workers,
+        store_dir=None if args.no_store else args.store, series_timeout=args.series_timeout or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# pipeline/annual.py — jeux annuels : brut -> interpolé -> comparaison avec crise (notebooks scripts/<domaine>.ipynb)
+"""
+- interpolate : complétion PLF / CFX / TOTAL (CSV brut lu par pipeline.ingest) et
+  interpolation linéaire par (indicateur, sous-indicateur), de 2011 (au plus tard) à l'année
+  suivant la dernière observée
+- with_crise : valeurs annuelles x coefficient de crise du domaine (répartitions de
+  satisfaction qualité dégradées plutôt que multipliées), comparées aux valeurs normales
+"""
+
+import numpy as np
+import pandas as pd
+
+
+VALUE_COLUMNS = ["PLF", "CFX", "TOTAL"]
+RAW_COLUMNS = ["ANNEE", "INDICATEUR", "SOUS-INDICATEUR", "PLF", "CFX", "TOTAL", "UNITE"]
+MERGE_COLUMNS = ["ANNEE", "INDICATEUR", "SOUS-INDICATEUR"]
+
+# Première année des séries interpolées
+FIRST_YEAR = 2011
+
+
+def _interpolate_group(g: pd.DataFrame, indicateur, sous_indicateur) -> pd.DataFrame:
+    unite = g["UNITE"].dropna().iloc[0] if g["UNITE"].notna().any() else np.nan
+
+    # Part de PLF dans PLF + CFX quand les deux sont connus (répartition de TOTAL)
+    known = g["PLF"].notna() & g["CFX"].notna() & ((g["PLF"] + g["CFX"]) > 0)
+    ratio = (g.loc[known, "PLF"] / (g.loc[known, "PLF"] + g.loc[known, "CFX"])).median() if known.any() else np.nan
+    if np.isnan(ratio):
+        ratio = 0.5
+
+    g = g.set_index("ANNEE")
+    g = g.reindex(range(min(FIRST_YEAR, g.index.min()), g.index.max() + 2))
+    g["INDICATEUR"] = indicateur
+    g["SOUS-INDICATEUR"] = sous_indicateur
+    g["UNITE"] = unite
+
+    m = g["TOTAL"].notna() & g["PLF"].notna() & g["CFX"].isna()
+    g.loc[m, "CFX"] = g.loc[m, "TOTAL"] - g.loc[m, "PLF"]
+    m = g["TOTAL"].notna() & g["CFX"].notna() & g["PLF"].isna()
+    g.loc[m, "PLF"] = g.loc[m, "TOTAL"] - g.loc[m, "CFX"]
+    m = g["TOTAL"].notna() & g["PLF"].isna() & g["CFX"].isna()
+    g.loc[m, "PLF"] = g.loc[m, "TOTAL"] * ratio
+    g.loc[m, "CFX"] = g.loc[m, "TOTAL"] * (1 - ratio)
+
+    g["PLF"] = g["PLF"].interpolate(method="linear", limit_direction="both")
+    g["CFX"] = g["CFX"].interpolate(method="linear", limit_direction="both")
+    mt = g["TOTAL"].isna()
+    g.loc[mt, "TOTAL"] = g.loc[mt, "PLF"] + g.loc[mt, "CFX"]
+    g[VALUE_COLUMNS] = g[VALUE_COLUMNS].round(2)
+    return g.rename_axis("ANNEE").reset_index()
+
+
+def interpolate(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jeu annuel interpolé (<domaine>-data-interpolated.csv).
+
+    Args:
+        df_raw: CSV brut converti (voir ingest.load_raw)
+
+    Returns:
+        DataFrame (voir RAW_COLUMNS), une ligne par (indicateur, sous-indicateur, année)
+    """
+    df = df_raw.sort_values(["INDICATEUR", "SOUS-INDICATEUR", "ANNEE"])
+    parts = [
+        _interpolate_group(g, indicateur, sous_indicateur)
+        for (indicateur, sous_indicateur), g in df.groupby(["INDICATEUR", "SOUS-INDICATEUR"], sort=True)
+    ]
+    return pd.concat(parts, ignore_index=True)[RAW_COLUMNS]
+
+
+def _degrade_distributions(df_crise: pd.DataFrame, degradation: dict) -> pd.Series:
+    """
+    Répartitions de satisfaction en % : redistribuées par la matrice de dégradation
+    (par année et indicateur), PLF / CFX gardant leur part normale. Modifie df_crise.
+
+    Returns:
+        masque des lignes redistribuées
+    """
+    sous = df_crise["SOUS-INDICATEUR"].astype(str).str.strip()
+    mask = (df_crise["UNITE"] == "%") & sous.isin(list(degradation))
+    for _, group in df_crise[mask].groupby(["ANNEE", "INDICATEUR"]):
+        distribution = {}
+        for _, row in group.iterrows():
+            for target, weight in degradation[str(row["SOUS-INDICATEUR"]).strip()].items():
+                distribution[target] = distribution.get(target, 0) + row["PLF"] * weight
+        total = sum(distribution.values())
+        if total > 0:
+            distribution = {k: v / total * 100 for k, v in distribution.items()}
+        for idx, row in group.iterrows():
+            target = str(row["SOUS-INDICATEUR"]).strip()
+            if target in distribution:
+                ratio_plf = row["PLF"] / row["TOTAL"] if row["TOTAL"] > 0 else 0.5
+                df_crise.loc[idx, "PLF"] = round(distribution[target] * ratio_plf, 2)
+                df_crise.loc[idx, "CFX"] = round(distribution[target] * (1 - ratio_plf), 2)
+                df_crise.loc[idx, "TOTAL"] = round(distribution[target], 2)
+    return mask
+
+
+def with_crise(df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """
+    Comparaison normal / crise (<domaine>-data-with-crise.csv).
+
+    Args:
+        df: jeu annuel interpolé
+        config: paramètres du domaine (crise_coef, degradation éventuelle)
+
+    Returns:
+        colonnes du jeu interpolé suffixées _NORMAL / _CRISE, MODE, ECART_TOTAL, VARIATION_PCT
+    """
+    coef = config["crise_coef"]
+    df_normal = df.copy()
+    df_normal["MODE"] = "Normal"
+
+    df_crise = df.copy()
+    if "degradation" in config:
+        redistributed = _degrade_distributions(df_crise, config["degradation"])
+        df_normal["IS_PCT_DISTRIBUTION"] = redistributed
+        multiplied = ~redistributed
+    else:
+        multiplied = pd.Series(True, index=df_crise.index)
+    df_crise.loc[multiplied, "PLF"] = (df_crise.loc[multiplied, "PLF"] * coef).round(2)
+    df_crise.loc[multiplied, "CFX"] = (df_crise.loc[multiplied, "CFX"] * coef).round(2)
+    df_crise.loc[multiplied, "TOTAL"] = (df_crise.loc[multiplied, "PLF"] + df_crise.loc[multiplied, "CFX"]).round(2)
+
+    df_compare = df_normal.merge(df_crise[MERGE_COLUMNS + VALUE_COLUMNS], on=MERGE_COLUMNS,
+                                 suffixes=("_NORMAL", "_CRISE"))
+    df_compare["ECART_TOTAL"] = (df_compare["TOTAL_CRISE"] - df_compare["TOTAL_NORMAL"]).round(2)
+    df_compare["VARIATION_PCT"] = ((df_compare["ECART_TOTAL"] / df_compare["TOTAL_NORMAL"]) * 100).round(2)
+    return df_compare
@@ -0,0 +1,152 @@
+# pipeline/config.py — paramètres de génération par domaine (repris des notebooks scripts/)
+"""
+Un dict par domaine, lu par pipeline.stages :
+
+- crise_coef : coefficient appliqué aux valeurs annuelles du jeu « with-crise » (<domaine>.ipynb)
+- monthly : méthode annuel -> mensuel (<domaine>-saisonnalite.ipynb)
+    - "direct" : % mensuels (activity-service, capacity, finance)
+    - "daily" : passage par le journalier, puis agrégation en mois (logistics, patients)
+    - "hr" / "quality" : % mensuels bruités par ligne, répartition propre au domaine
+- month_pct / crise_pct : répartitions mensuelles normale et de crise (dict mois -> %)
+- rounding / default_decimals : décimales par unité (ROUNDING_BY_UNIT / DEFAULT_DECIMALS)
+- daily : paramètres journaliers (voir disaggregate.DAILY_PARAMS)
+"""
+
+from pipeline.disaggregate import DAILY_PARAMS
+
+
+# Répartition quasi-uniforme des indicateurs RH stables (légère baisse l'été, reprise à l'automne)
+_HR_BASE = 100 / 12
+HR_STABLE_PCT = {
+    1: _HR_BASE, 2: _HR_BASE, 3: _HR_BASE, 4: _HR_BASE, 5: _HR_BASE, 6: _HR_BASE - 0.5,
+    7: _HR_BASE - 1.0, 8: _HR_BASE - 0.5, 9: _HR_BASE + 0.5, 10: _HR_BASE + 0.5, 11: _HR_BASE + 0.5, 12: _HR_BASE,
+}
+
+UNIFORM_PCT = {m: 100 / 12 for m in range(1, 13)}
+
+
+DOMAIN_CONFIGS = {
+    "activity-service": {
+        "crise_coef": 1.70,
+        "monthly": "direct",
+        # Saisonnalité hospitalière (pics hivernal et canicule) / crise (COVID, canicule)
+        "month_pct": {1: 11, 2: 9, 3: 7, 4: 6, 5: 6, 6: 6, 7: 9, 8: 11, 9: 8, 10: 10, 11: 10, 12: 7},
+        "crise_pct": {1: 7, 2: 10, 3: 16, 4: 15, 5: 9, 6: 3, 7: 7, 8: 13, 9: 5, 10: 6, 11: 6, 12: 3},
+        "rounding": {
+            "actes": 0, "accouchements": 0, "naissances": 0, "sejours": 0, "centres": 0, "greffes": 0,
+            "hospitalisations": 0, "services": 0, "€": 2, "consultations": 0, "seances": 0, "essais": 0,
+            "publications": 0, "groupes": 0, "phrc": 0, "programmes": 0, "etudiants": 0,
+            "transplantions": 0, "transplations": 0, "prelevements": 0, "passages": 0, "patients": 0,
+        },
+        "default_decimals": 0,
+    },
+    "capacity": {
+        "crise_coef": 1.50,
+        "monthly": "direct",
+        # Lits et équipements : faible saisonnalité / ressources critiques en crise
+        "month_pct": {1: 10, 2: 8, 3: 7, 4: 7, 5: 7, 6: 7, 7: 9, 8: 11, 9: 8, 10: 9, 11: 9, 12: 8},
+        "crise_pct": {1: 8, 2: 9, 3: 13, 4: 11, 5: 8, 6: 2, 7: 5, 8: 12, 9: 6, 10: 8, 11: 7, 12: 11},
+        "rounding": {
+            "salles": 0, "scanners": 0, "echographes": 0, "appareils": 0, "accelerateurs": 0,
+            "laboratoires": 0, "lits": 0, "places": 0, "centres": 0, "départements": 0, "instituts": 0,
+            "poles": 0, "sejours": 0, "journées": 0, "lithotripteurs": 0, "gamma-caméras": 0,
+            "blocs opératoires": 0, "chambres": 0,
+        },
+        "default_decimals": 0,
+    },
+    "finance": {
+        "crise_coef": 1.70,
+        "monthly": "direct",
+        # Cycle budgétaire (clôture en décembre) / surcoûts de crise
+        "month_pct": {1: 10, 2: 8, 3: 7, 4: 6, 5: 5, 6: 8, 7: 7, 8: 9, 9: 8, 10: 9, 11: 10, 12: 13},
+        "crise_pct": {1: 8, 2: 9, 3: 14, 4: 13, 5: 8, 6: 3, 7: 6, 8: 13, 9: 6, 10: 5, 11: 7, 12: 8},
+        "rounding": {"€": 2},
+        "default_decimals": 2,
+    },
+    "hr": {
+        "crise_coef": 1.70,
+        "monthly": "hr",
+        # Indicateurs volatils (médecins, soignants, internes) ; les stables suivent HR_STABLE_PCT
+        "month_pct": {1: 10.0, 2: 9.0, 3: 7.0, 4: 8.0, 5: 8.0, 6: 8.0, 7: 7.0, 8: 9.0, 9: 9.0, 10: 9.0, 11: 8.0, 12: 8.0},
+        "crise_pct": {1: 11.0, 2: 10.5, 3: 8.5, 4: 10.0, 5: 9.0, 6: 5.5, 7: 5.0, 8: 5.5, 9: 7.5, 10: 8.0, 11: 8.5, 12: 11.0},
+        "rounding": {"personnes": 0},
+        "default_decimals": 0,
+        "stable_pct": HR_STABLE_PCT,
+        "stable_sous_indicateurs": [
+            "Personnel administratif", "Personnel technique et ouvrier", "Personnel technique & ouvrier ",
+            "Direction & administratif ", "Personnels administratifs, techniques et ouvriers",
+            "Personnel socio-éducatif", "Personnel socio-éducatif ", "Total en ETP",
+            "ETP Moyen MCO", "ETP Moyen PSY", "ETP Moyen SSR", "Âge Moyen MCO", "Âge Moyen PSY", "Âge Moyen SSR",
+        ],
+        # Valeur annuelle de crise = valeur x multiplicateur ; bruit lognormal par ligne (normal / crise)
+        "crise_multiplier": 1.4,
+        "noise_sigma": 0.03,
+        "crise_noise_sigma": 0.05,
+        "crise_seed_offset": 1000,
+    },
+    "logistics": {
+        "crise_coef": 1.70,
+        "monthly": "daily",
+        "month_pct": {1: 15, 2: 10, 3: 7, 4: 6, 5: 5, 6: 6, 7: 13, 8: 13, 9: 6, 10: 5, 11: 4, 12: 10},
+        "crise_pct": {1: 12, 2: 8, 3: 13, 4: 14, 5: 7, 6: 4, 7: 3, 8: 4, 9: 5, 10: 10, 11: 12, 12: 8},
+        "rounding": {
+            "colis": 0, "colis/jour": 0, "plis": 0, "plis/jour": 0, "repas": 0, "repas/jour": 0,
+            "références": 0, "kg": 0, "t": 2, "km": 1, "m2": 1, "m2/mois": 1,
+        },
+        "default_decimals": 2,
+        "daily": DAILY_PARAMS,
+    },
+    "patients": {
+        "crise_coef": 1.80,
+        "monthly": "daily",
+        "month_pct": {1: 15, 2: 10, 3: 7, 4: 6, 5: 5, 6: 6, 7: 13, 8: 13, 9: 6, 10: 5, 11: 4, 12: 10},
+        "crise_pct": {1: 12, 2: 7, 3: 15, 4: 18, 5: 8, 6: 4, 7: 3, 8: 3, 9: 6, 10: 10, 11: 9, 12: 5},
+        "rounding": {"patients": 0, "%": 2, "colis": 0, "repas": 0, "kg": 0, "t": 2, "km": 1, "m2": 1},
+        "default_decimals": 2,
+        "daily": DAILY_PARAMS,
+    },
+    "quality": {
+        "crise_coef": 1.70,
+        "monthly": "quality",
+        # Variations modérées (charge hospitalière) / forte dégradation en crise
+        "month_pct": {1: 9.0, 2: 8.5, 3: 8.0, 4: 8.5, 5: 8.5, 6: 8.5, 7: 8.0, 8: 8.0, 9: 8.0, 10: 8.0, 11: 8.5, 12: 8.5},
+        "crise_pct": {1: 6.0, 2: 6.5, 3: 7.0, 4: 8.0, 5: 9.0, 6: 9.5, 7: 7.0, 8: 7.5, 9: 9.5, 10: 7.5, 11: 7.0, 12: 7.5},
+        "default_decimals": 2,
+        "stable_indicateurs": [
+            "Indicateurs Pour l'Amélioration de la Qualité et de la Sécurité des Soins",
+        ],
+        "stable_sous_indicateurs": [
+            "Compte rendu", "Dossier d'anesthésie", "Dossier médical", "Dépistage des troubles nutritionnels",
+            "Evaluation de la douleur", "Évaluation de la douleur", "Infarctus du myocarde",
+            "Prévention des escarres", "Réunions de concertation en cancérologie (RCP)",
+            "Réunions de concertation pluridisciplinaires (RCP)", "Troubles nutritionnels",
+            "Accident Vasculaire Cérébral-Date et heure de survenue de l'AVC",
+            "Accident Vasculaire Cérébral-Evaluation par un rééducateur",
+            "Accident Vasculaire Cérébral-Tenue du dossier médical",
+            "Dialyse rénale-Transplantation-Transplantation",
+            "Hémorragie du Post-Partum-Prévention après l'accouchement",
+            "Hémorragie du Post-Partum-Prévention pendant l'accouchement",
+            "Hémorragie du Post-Partum-Traitement en cas d'hémorragie",
+            "Infarctus du myocarde-Sensibilisation aux règles hygiéno-diététiques",
+        ],
+        # Seuls ces sous-indicateurs suivent crise_pct en crise (les autres : répartition uniforme)
+        "volatile_sous_indicateurs": [
+            "Bon", "Excellent", "Mauvais", "Tres bon ", "Très mauvais", "Pas de réponse", "pas de reponse",
+        ],
+        # Répartitions de satisfaction en % : pas de bruit mensuel
+        "percentage_categories": [
+            "Excellent", "Tres bon ", "Bon", "Mauvais", "Très mauvais", "Pas de réponse", "pas de reponse",
+        ],
+        "noise_sigma": 0.03,
+        "crise_noise_sigma": 0.05,
+        "crise_seed_offset": 10000,
+        # Jeu « with-crise » : les répartitions de satisfaction se dégradent au lieu d'être multipliées
+        "degradation": {
+            "Excellent": {"Excellent": 0.50, "Tres bon": 0.30, "Bon": 0.15, "Moyen": 0.05, "Mauvais": 0.00},
+            "Tres bon": {"Excellent": 0.00, "Tres bon": 0.40, "Bon": 0.40, "Moyen": 0.15, "Mauvais": 0.05},
+            "Bon": {"Excellent": 0.00, "Tres bon": 0.10, "Bon": 0.40, "Moyen": 0.35, "Mauvais": 0.15},
+            "Moyen": {"Excellent": 0.00, "Tres bon": 0.00, "Bon": 0.15, "Moyen": 0.45, "Mauvais": 0.40},
+            "Mauvais": {"Excellent": 0.00, "Tres bon": 0.00, "Bon": 0.00, "Moyen": 0.20, "Mauvais": 0.80},
+        },
+    },
+}
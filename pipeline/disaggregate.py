@@ -0,0 +1,264 @@
+# pipeline/disaggregate.py — répartition vectorisée des valeurs annuelles en valeurs mensuelles
+"""
+Reprise des générateurs `annual_to_monthly` / `annual_to_daily` des notebooks
+scripts/*-saisonnalite.ipynb, sans boucle par ligne ni DataFrame intermédiaire :
+toutes les paires (ligne annuelle, site) forment une matrice (séries x jours) ou
+(séries x mois), et les % mensuels, l'effet semaine / week-end et le bruit lognormal
+s'appliquent par broadcasting.
+
+Deux modes, comme dans les notebooks :
+
+- répartition directe (activity-service, capacity, finance) : valeur annuelle x % du mois ;
+- passage par le journalier (logistics, patients) : poids journaliers (semaine / week-end x bruit)
+  normalisés dans chaque mois, arrondis par jour puis agrégés directement en mois.
+
+Les notebooks créent un générateur aléatoire de même graine à chaque appel : le bruit d'une
+année est donc le même pour toutes les séries ; il est tiré une fois par année ici, ce qui
+donne les mêmes valeurs.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+SITES = ("PLF", "CFX")
+MONTHS = np.arange(1, 13)
+
+KEY_COLUMNS = ["year", "site_code", "indicateur", "sous_indicateur", "unite"]
+OUT_COLUMNS = ["year", "month", "site_code", "indicateur", "sous_indicateur", "unite", "value", "value_crise"]
+
+# Paramètres journaliers par défaut des notebooks logistics / patients
+DAILY_PARAMS = {
+    "weekend_factor": 0.80,
+    "weekday_factor": 1.05,
+    "noise_sigma": 0.08,
+    "seed": 42,
+}
+
+
+def month_fractions(month_pct: dict) -> np.ndarray:
+    """Parts mensuelles (12,) à partir d'un dict mois -> %."""
+    return np.array([month_pct[m] / 100.0 for m in MONTHS], dtype="float64")
+
+
+def annual_series(df_annual: pd.DataFrame, sites=SITES) -> tuple:
+    """
+    Paires (ligne annuelle, site) renseignées, dans l'ordre des notebooks (ligne puis site).
+
+    Args:
+        df_annual: CSV annuel (ANNEE, INDICATEUR, SOUS-INDICATEUR, UNITE, une colonne par site)
+        sites: colonnes de sites à répartir
+
+    Returns:
+        (DataFrame des clés (voir KEY_COLUMNS), valeurs annuelles (séries,), position de la ligne source)
+    """
+    values = df_annual[list(sites)].to_numpy(dtype="float64")
+    rows, cols = np.nonzero(~np.isnan(values))
+    keys = pd.DataFrame({
+        "year": df_annual["ANNEE"].to_numpy(dtype="int64")[rows],
+        "site_code": np.asarray(sites, dtype=object)[cols],
+        "indicateur": df_annual["INDICATEUR"].to_numpy()[rows],
+        "sous_indicateur": df_annual["SOUS-INDICATEUR"].to_numpy()[rows],
+        "unite": df_annual["UNITE"].to_numpy()[rows],
+    })
+    return keys, values[rows, cols], rows
+
+
+def unit_decimals(unites, rounding: dict = None, default: int = 0) -> np.ndarray:
+    """Nombre de décimales par série selon son unité (ROUNDING_BY_UNIT des notebooks)."""
+    rounding = {str(u).strip(): d for u, d in (rounding or {}).items()}
+    labels = pd.Series(unites).astype(str).str.strip()
+    return labels.map(rounding).fillna(default).to_numpy(dtype="int64")
+
+
+def round_rows(values: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+    """Arrondit chaque ligne de la matrice à son nombre de décimales."""
+    out = np.empty_like(values)
+    for d in np.unique(decimals):
+        rows = decimals == d
+        out[rows] = np.round(values[rows], int(d))
+    return out
+
+
+def round_exact(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Arrondi identique au round() de Python (valeur décimale exacte), là où np.round peut
+    différer : seules les valeurs à moins de 1e-6 d'une demi-unité repassent par round().
+    """
+    out = np.round(values, decimals)
+    scaled = np.abs(values) * 10.0 ** decimals
+    tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    flat_in, flat_out = values.ravel(), out.ravel()
+    for i in tie:
+        flat_out[i] = round(float(flat_in[i]), decimals)
+    return out
+
+
+def annual_to_monthly(annual: np.ndarray, month_pct: dict) -> np.ndarray:
+    """Répartition directe : matrice (séries x 12) = valeur annuelle x % du mois."""
+    return np.asarray(annual, dtype="float64")[:, None] * month_fractions(month_pct)[None, :]
+
+
+def seeded_noise(seeds, noise_sigma: float) -> np.ndarray:
+    """
+    Facteurs de bruit lognormal mensuels (séries x 12), un générateur de graine propre par
+    série comme les notebooks hr / quality (seed=42 + numéro de ligne).
+    """
+    if noise_sigma <= 0:
+        return np.ones((len(seeds), 12))
+    draws = [np.random.default_rng(int(seed)).normal(loc=0.0, scale=noise_sigma, size=12) for seed in seeds]
+    return np.exp(np.array(draws).reshape(len(seeds), 12))
+
+
+def calendar(year: int) -> tuple:
+    """(mois 0..11 de chaque jour, jour de week-end, premier jour de chaque mois) pour `year`."""
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+    month = days.month.to_numpy() - 1
+    starts = np.flatnonzero(np.r_[True, month[1:] != month[:-1]])
+    return month, days.weekday.to_numpy() >= 5, starts
+
+
+def daily_shares(year: int, weekend_factor: float = 0.80, weekday_factor: float = 1.05,
+                 noise_sigma: float = 0.08, seed: int = 42) -> np.ndarray:
+    """
+    Part de chaque jour dans son mois (somme 1 par mois), commune à toutes les séries de l'année.
+
+    Returns:
+        vecteur (jours,)
+    """
+    month, weekend, starts = calendar(year)
+    base = np.where(weekend, weekend_factor, weekday_factor).astype(float)
+    if noise_sigma > 0:
+        # Mêmes tirages que les notebooks : mois après mois sur un générateur de graine `seed`
+        noise = np.exp(np.random.default_rng(seed).normal(loc=0.0, scale=noise_sigma, size=len(month)))
+    else:
+        noise = np.ones(len(month), dtype=float)
+    weights = base * noise
+    shares = np.empty_like(weights)
+    for lo, hi in zip(starts, np.r_[starts[1:], len(month)]):
+        w = weights[lo:hi]
+        if w.sum() == 0:
+            w = np.ones_like(w)
+        shares[lo:hi] = w / w.sum()
+    return shares
+
+
+def annual_to_daily(annual: np.ndarray, year: int, month_pct: dict, weekend_factor: float = 0.80,
+                    weekday_factor: float = 1.05, noise_sigma: float = 0.08, seed: int = 42) -> np.ndarray:
+    """
+    Répartition journalière de toutes les séries d'une même année.
+
+    Les % mensuels sont respectés strictement ; le dernier jour absorbe l'écart d'arrondi
+    flottant pour retrouver exactement la valeur annuelle.
+
+    Args:
+        annual: valeurs annuelles (séries,)
+        year: année
+        month_pct: dict mois -> %
+
+    Returns:
+        matrice (séries x jours)
+    """
+    annual = np.asarray(annual, dtype="float64")
+    month, _, _ = calendar(year)
+    shares = daily_shares(year, weekend_factor, weekday_factor, noise_sigma, seed)
+    daily = (annual[:, None] * month_fractions(month_pct)[month][None, :]) * shares[None, :]
+    daily[:, -1] += annual - daily.sum(axis=1)
+    return daily
+
+
+def compensated_sum(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Sommes par groupe de colonnes (sommation de Kahan, colonne après colonne), comme le
+    groupby(...).sum() de pandas : les totaux sont identiques à ceux des notebooks.
+
+    Args:
+        values: matrice (séries x colonnes)
+        groups: groupe de chaque colonne (0..n_groups-1)
+        n_groups: nombre de groupes
+
+    Returns:
+        matrice (séries x n_groups)
+    """
+    total = np.zeros((len(values), n_groups))
+    compensation = np.zeros_like(total)
+    for j, g in enumerate(groups):
+        y = values[:, j] - compensation[:, g]
+        t = total[:, g] + y
+        compensation[:, g] = (t - total[:, g]) - y
+        total[:, g] = t
+    return total
+
+
+def daily_to_monthly(daily: np.ndarray, year: int) -> np.ndarray:
+    """Somme des jours de chaque mois : matrice (séries x 12)."""
+    return compensated_sum(daily, calendar(year)[0], 12)
+
+
+def daily_monthly(annual: np.ndarray, years: np.ndarray, decimals: np.ndarray, month_pct: dict,
+                  **params) -> np.ndarray:
+    """
+    Valeurs mensuelles issues du journalier arrondi (jours arrondis par unité puis sommés).
+
+    Args:
+        annual: valeurs annuelles (séries,)
+        years: année de chaque série
+        decimals: décimales de chaque série (voir unit_decimals)
+        month_pct: dict mois -> %
+        params: paramètres de annual_to_daily (voir DAILY_PARAMS)
+
+    Returns:
+        matrice (séries x 12), non arrondie
+    """
+    monthly = np.empty((len(annual), 12))
+    for year in np.unique(years):
+        rows = years == year
+        daily = annual_to_daily(annual[rows], int(year), month_pct, **params)
+        monthly[rows] = daily_to_monthly(round_rows(daily, decimals[rows]), int(year))
+    return monthly
+
+
+def disaggregate(df_annual: pd.DataFrame, month_pct: dict, crise_pct: dict, rounding: dict = None,
+                 default_decimals: int = 0, daily: dict = None, sites=SITES) -> pd.DataFrame:
+    """
+    CSV annuel -> données mensuelles reconstituées (value, value_crise), comme les notebooks.
+
+    Args:
+        df_annual: CSV annuel interpolé (voir annual_series)
+        month_pct: répartition mensuelle normale (dict mois -> %)
+        crise_pct: répartition mensuelle de crise
+        rounding: décimales par unité (ROUNDING_BY_UNIT)
+        default_decimals: décimales des unités absentes de `rounding`
+        daily: None pour la répartition directe ; paramètres journaliers (voir DAILY_PARAMS)
+            pour passer par le journalier
+        sites: colonnes de sites
+
+    Returns:
+        DataFrame mensuel (voir OUT_COLUMNS)
+    """
+    keys, annual, _ = annual_series(df_annual, sites)
+    decimals = unit_decimals(keys["unite"], rounding, default_decimals)
+
+    if daily is None:
+        value = round_rows(annual_to_monthly(annual, month_pct), decimals)
+        crise = round_rows(annual_to_monthly(annual, crise_pct), decimals)
+    else:
+        monthly = daily_monthly(annual, keys["year"].to_numpy(), decimals, month_pct, **daily)
+        # Crise : même total annuel (journalier arrondi), profil mensuel de crise
+        total = compensated_sum(monthly, np.zeros(12, dtype="int64"), 1)[:, 0]
+        crise = round_rows(annual_to_monthly(total, crise_pct), decimals)
+        value = round_rows(monthly, decimals)
+
+    out = keys.loc[keys.index.repeat(12)].reset_index(drop=True)
+    out.insert(1, "month", np.tile(MONTHS, len(keys)))
+    out["value"] = value.ravel()
+    out["value_crise"] = crise.ravel()
+
+    if daily is None:
+        # Mois vides (valeur et crise nulles) supprimés
+        out = out[(out["value"] > 0) | (out["value_crise"] > 0)]
+    else:
+        # Séries d'une année entièrement nulles supprimées ; ordre du groupby des notebooks
+        out = out[np.repeat(value.sum(axis=1) > 0, 12)]
+        out = out.sort_values(["year", "month", "site_code", "indicateur", "sous_indicateur", "unite"], kind="stable")
+    return out[OUT_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,120 @@
+# pipeline/incremental.py — empreintes de contenu par groupe et manifeste de construction d'un domaine
+"""
+Chaque étape de la chaîne ne dépend, pour un groupe (indicateur, sous-indicateur), que des
+lignes de ce groupe dans ses entrées. Le manifeste d'un domaine (.cache/pipeline/<domaine>.json)
+conserve, par étape :
+
+- params  : empreinte des paramètres dont dépend le résultat (config du domaine, année...)
+- outputs : empreinte de chaque fichier écrit (un fichier modifié ou supprimé à la main est reconstruit)
+- groups  : empreinte des lignes d'entrée de chaque groupe
+
+Une étape dont les empreintes de groupes ont changé ne recalcule que ces groupes : leurs lignes
+sont remplacées dans les sorties existantes, les autres sont conservées telles quelles.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+BUILD_DIR = os.path.join(".cache", "pipeline")
+
+# Séparateur des colonnes dans les clés de groupe
+KEY_SEPARATOR = "\x1f"
+
+
+def key_strings(df: pd.DataFrame, columns: list) -> pd.Series:
+    """Clé texte de chaque ligne (colonnes jointes, NaN -> "nan"), comparable d'un fichier à l'autre."""
+    keys = df[columns[0]].astype(str).fillna("nan")
+    for col in columns[1:]:
+        keys = keys + KEY_SEPARATOR + df[col].astype(str).fillna("nan")
+    return keys
+
+
+def group_hashes(df: pd.DataFrame, columns: list, positional: bool = False) -> dict:
+    """
+    Empreinte des lignes de chaque groupe.
+
+    Args:
+        df: DataFrame d'entrée d'une étape
+        columns: colonnes définissant les groupes
+        positional: inclut la position des lignes (étapes dont le résultat dépend de l'index,
+            ex. graines aléatoires par ligne)
+
+    Returns:
+        {clé texte du groupe: empreinte}
+    """
+    header = KEY_SEPARATOR.join(map(str, df.columns)).encode("utf-8")
+    rows = pd.util.hash_pandas_object(df, index=positional).to_numpy()
+    keys = key_strings(df, columns).to_numpy()
+    order = np.argsort(keys, kind="stable")
+    keys, rows = keys[order], rows[order]
+    bounds = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1], True])
+    return {
+        keys[start]: hashlib.sha256(header + rows[start:end].tobytes()).hexdigest()
+        for start, end in zip(bounds[:-1], bounds[1:])
+    }
+
+
+def combine_hashes(hashes: list) -> dict:
+    """Empreintes de groupes de plusieurs entrées réunies (groupe absent d'une entrée : "")."""
+    keys = sorted(set().union(*hashes))
+    return {key: "|".join(h.get(key, "") for h in hashes) for key in keys}
+
+
+def file_hash(path: str):
+    """Empreinte du contenu d'un fichier, None s'il n'existe pas."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def params_hash(params) -> str:
+    """Empreinte de paramètres sérialisables en JSON (clés triées)."""
+    text = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def stale_groups(old: dict, new: dict) -> set:
+    """Groupes modifiés, ajoutés ou supprimés entre deux jeux d'empreintes."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def splice(old_out: pd.DataFrame, new_out: pd.DataFrame, columns: list, stale: set) -> pd.DataFrame:
+    """Sortie existante privée des groupes `stale`, complétée par leurs nouvelles lignes."""
+    kept = old_out[~key_strings(old_out, columns).isin(stale)]
+    if new_out.empty:
+        return kept.reset_index(drop=True)
+    return pd.concat([kept, new_out], ignore_index=True)
+
+
+def manifest_path(domain: str, root: str = BUILD_DIR) -> str:
+    """Chemin du manifeste d'un domaine."""
+    return os.path.join(root, f"{domain}.json")
+
+
+def load_manifest(domain: str, root: str = BUILD_DIR) -> dict:
+    """Manifeste d'un domaine ({} si absent ou illisible : tout sera reconstruit)."""
+    try:
+        with open(manifest_path(domain, root), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(domain: str, manifest: dict, root: str = BUILD_DIR) -> None:
+    """Écrit le manifeste d'un domaine (remplacement atomique)."""
+    path = manifest_path(domain, root)
+    os.makedirs(root, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, path)
@@ -0,0 +1,103 @@
+# pipeline/ingest.py — lecture des CSV bruts <domaine>-data.csv (nombres au format français)
+"""
+Les CSV bruts stockent les nombres comme « 1 086,19 », « 9 968 » ou « 766 000 000 » :
+séparateur de milliers espace (parfois insécable ou fine insécable), virgule décimale.
+
+Toutes les cellules PLF / CFX / TOTAL des fichiers lus ensemble sont converties en un seul
+passage vectorisé (opérations de chaînes pandas, validation par expression régulière, puis
+conversion en float64), sans essai float() cellule par cellule. Les cellules non vides qui
+ne sont pas des nombres deviennent NaN et sont signalées toutes ensemble (fichier, ligne du
+CSV, colonne, texte d'origine).
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipeline.annual import VALUE_COLUMNS
+
+
+# Séparateurs de milliers retirés : espace, insécable (U+00A0), fine insécable (U+202F), tabulation
+THOUSANDS_SEPARATORS = (" ", "\u00a0", "\u202f", "\t")
+
+# Nombre valide une fois les séparateurs retirés et la virgule remplacée par un point
+NUMBER_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+INVALID_COLUMNS = ["fichier", "ligne", "colonne", "valeur"]
+
+
+def parse_numbers(values: pd.Series) -> tuple:
+    """
+    « 1 086,19 » -> 1086.19, pour toute une série de cellules à la fois.
+
+    Args:
+        values: cellules texte (NaN pour les cellules vides)
+
+    Returns:
+        (nombres float64, masque des cellules non vides qui ne sont pas des nombres)
+    """
+    text = values.astype("string")
+    for sep in THOUSANDS_SEPARATORS:
+        text = text.str.replace(sep, "", regex=False)
+    text = text.str.replace(",", ".", regex=False)
+    # Conversion rapide des seules cellules valides (pas d'essai cellule par cellule)
+    valid = text.str.fullmatch(NUMBER_PATTERN).fillna(False).to_numpy(dtype=bool)
+    numbers = text.where(valid).astype("float64").to_numpy()
+    filled = text.fillna("")
+    invalid = ~valid & (filled != "").to_numpy(dtype=bool) & (filled.str.lower() != "nan").to_numpy(dtype=bool)
+    return pd.Series(numbers, index=values.index), pd.Series(invalid, index=values.index)
+
+
+def _read(path: str) -> pd.DataFrame:
+    """CSV brut avec les colonnes de valeurs lues comme texte (en-têtes nettoyés)."""
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(path, dtype={col: str for col in header if col.strip() in VALUE_COLUMNS})
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def read_raw(paths) -> tuple:
+    """
+    Lit plusieurs CSV bruts et convertit leurs colonnes PLF / CFX / TOTAL en un seul passage.
+
+    Args:
+        paths: chemins des CSV bruts
+
+    Returns:
+        ({chemin: DataFrame converti}, DataFrame des cellules invalides (voir INVALID_COLUMNS))
+    """
+    frames = {path: _read(path) for path in paths}
+    parts = [(path, col) for path, df in frames.items() for col in VALUE_COLUMNS]
+    lengths = np.array([len(frames[path]) for path, _ in parts], dtype="int64")
+    if lengths.sum() == 0:
+        return frames, pd.DataFrame(columns=INVALID_COLUMNS)
+
+    cells = pd.concat([frames[path][col] for path, col in parts], ignore_index=True)
+    numbers, invalid = parse_numbers(cells)
+    bounds = np.r_[0, np.cumsum(lengths)]
+    for (path, col), start, end in zip(parts, bounds[:-1], bounds[1:]):
+        frames[path][col] = numbers.to_numpy()[start:end]
+
+    # Ligne du CSV : en-tête en ligne 1
+    lines = np.concatenate([frames[path].index.to_numpy() + 2 for path, _ in parts])
+    bad = invalid.to_numpy()
+    report = pd.DataFrame({
+        "fichier": np.repeat([path for path, _ in parts], lengths)[bad],
+        "ligne": lines[bad],
+        "colonne": np.repeat([col for _, col in parts], lengths)[bad],
+        "valeur": cells.to_numpy()[bad],
+    })
+    return frames, report
+
+
+def report_invalid(invalid: pd.DataFrame) -> None:
+    """Affiche les cellules non numériques, regroupées par fichier."""
+    for path, cells in invalid.groupby("fichier", sort=False):
+        print(f"{path} : {len(cells)} cellule(s) non numérique(s), laissée(s) vide(s)")
+        print(cells[["ligne", "colonne", "valeur"]].to_string(index=False))
+
+
+def load_raw(path: str) -> pd.DataFrame:
+    """CSV brut <domaine>-data.csv avec PLF / CFX / TOTAL convertis en nombres (cellules invalides signalées)."""
+    frames, invalid = read_raw([path])
+    report_invalid(invalid)
+    return frames[path]
@@ -0,0 +1,110 @@
+# pipeline/monthly.py — données mensuelles reconstituées de chaque domaine (annuel interpolé -> mensuel)
+"""
+Reprise des cellules de génération des notebooks scripts/<domaine>-saisonnalite.ipynb,
+paramétrée par pipeline.config :
+
+- "direct" / "daily" : voir disaggregate.disaggregate
+- "hr" : % mensuels bruités par ligne (indicateurs stables / volatils), crise = valeur x multiplicateur
+- "quality" : % mensuels bruités par ligne, sans bruit pour les répartitions de satisfaction en %
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipeline.config import UNIFORM_PCT
+from pipeline.disaggregate import (
+    MONTHS,
+    OUT_COLUMNS,
+    SITES,
+    annual_series,
+    disaggregate,
+    month_fractions,
+    round_exact,
+    round_rows,
+    seeded_noise,
+    unit_decimals,
+)
+
+
+def _expand(keys: pd.DataFrame, value: np.ndarray, crise: np.ndarray) -> pd.DataFrame:
+    """Une ligne par (série, mois), dans l'ordre des séries."""
+    out = keys.loc[keys.index.repeat(12)].reset_index(drop=True)
+    out.insert(1, "month", np.tile(MONTHS, len(keys)))
+    out["value"] = value.ravel()
+    out["value_crise"] = crise.ravel()
+    return out
+
+
+def _profiles(masks: list, profiles: list) -> np.ndarray:
+    """Parts mensuelles (séries x 12) : profiles[k] pour les séries de masks[k] (le dernier l'emporte)."""
+    shares = np.empty((len(masks[0]), 12))
+    for mask, pct in zip(masks, profiles):
+        shares[mask] = month_fractions(pct)
+    return shares
+
+
+def monthly_hr(df_annual: pd.DataFrame, config: dict, sites=SITES) -> pd.DataFrame:
+    """
+    Mensuel RH : répartition par ligne avec bruit lognormal (graine 42 + ligne), somme annuelle
+    conservée ; la crise part de la valeur annuelle x crise_multiplier. Colonne `type` en plus.
+    """
+    keys, annual, rows = annual_series(df_annual, sites)
+    keep = annual != 0
+    keys, annual, rows = keys[keep].reset_index(drop=True), annual[keep], rows[keep]
+    seeds = 42 + df_annual.index.to_numpy()[rows]
+    stable = keys["sous_indicateur"].isin(config["stable_sous_indicateurs"]).to_numpy()
+    decimals = unit_decimals(keys["unite"], config["rounding"], config["default_decimals"])
+
+    def generate(total, pct, noise_sigma, seed_offset):
+        shares = _profiles([~stable, stable], [pct, config["stable_pct"]])
+        values = total[:, None] * shares * seeded_noise(seeds + seed_offset, noise_sigma)
+        return round_rows(values * (total / values.sum(axis=1))[:, None], decimals)
+
+    value = generate(annual, config["month_pct"], config["noise_sigma"], 0)
+    crise = generate(annual * config["crise_multiplier"], config["crise_pct"],
+                     config["crise_noise_sigma"], config["crise_seed_offset"])
+    out = _expand(keys, value, crise)
+    out["type"] = np.where(np.repeat(stable, 12), "STABLE", "VOLATILE")
+    return out[OUT_COLUMNS + ["type"]]
+
+
+def monthly_quality(df_annual: pd.DataFrame, config: dict, sites=SITES) -> pd.DataFrame:
+    """
+    Mensuel qualité : indicateurs stables uniformes, volatils selon month_pct ; bruit lognormal
+    par ligne sauf pour les répartitions de satisfaction en % ; arrondi à 2 décimales.
+    """
+    keys, annual, rows = annual_series(df_annual, sites)
+    seeds = 42 + df_annual.index.to_numpy()[rows]
+    sous = keys["sous_indicateur"]
+    stable = (keys["indicateur"].isin(config["stable_indicateurs"])
+              | sous.isin(config["stable_sous_indicateurs"])).to_numpy()
+    volatile_crise = sous.isin(config["volatile_sous_indicateurs"]).to_numpy()
+    percentage = ((keys["unite"] == "%") & sous.astype(str).str.strip().isin(config["percentage_categories"])).to_numpy()
+    decimals = config["default_decimals"]
+
+    def generate(pct_masks, profiles, noise_sigma, seed_offset):
+        values = annual[:, None] * _profiles(pct_masks, profiles)
+        noise = seeded_noise(seeds + seed_offset, noise_sigma)
+        values = np.where(percentage[:, None], values, values * noise)
+        # Somme séquentielle (comme sum() en Python), puis recalage sur la valeur annuelle
+        total = np.cumsum(values, axis=1)[:, -1]
+        scale = np.divide(annual, total, out=np.ones_like(total), where=total > 0)
+        values = np.where((total > 0)[:, None], values * scale[:, None], values)
+        return round_exact(values, decimals)
+
+    all_rows = np.ones(len(keys), dtype=bool)
+    value = generate([all_rows, stable], [config["month_pct"], UNIFORM_PCT], config["noise_sigma"], 0)
+    crise = generate([all_rows, volatile_crise], [UNIFORM_PCT, config["crise_pct"]],
+                     config["crise_noise_sigma"], config["crise_seed_offset"])
+    return _expand(keys, value, crise)[OUT_COLUMNS]
+
+
+def build_monthly(df_annual: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """CSV annuel interpolé -> DataFrame mensuel reconstitué, selon config["monthly"]."""
+    mode = config["monthly"]
+    if mode == "hr":
+        return monthly_hr(df_annual, config)
+    if mode == "quality":
+        return monthly_quality(df_annual, config)
+    return disaggregate(df_annual, config["month_pct"], config["crise_pct"], config.get("rounding"),
+                        config["default_decimals"], daily=config.get("daily") if mode == "daily" else None)
@@ -0,0 +1,334 @@
+# pipeline/stages.py — chaîne de génération d'un domaine et exécution de tous les domaines en parallèle
+"""
+Étapes, dans l'ordre (chacune lit la sortie de la précédente dans data/<domaine>/) :
+
+1. interpolated : <domaine>-data.csv -> <domaine>-data-interpolated.csv
+2. with-crise   : -> <domaine>-data-with-crise.csv (comparaison normal / crise annuelle)
+3. mensuelles   : -> <domaine>-donnees_mensuelles_reconstituees.csv
+4. forecast     : -> forecast_<année>_all_indicators.csv (+ rapport, voir forecasting.batch)
+5. all          : historique + prévisions -> <domaine>-all.csv
+
+Chaque domaine tourne dans son propre processus : la reconstruction complète dure le temps
+du domaine le plus long, pas la somme des domaines.
+
+Reconstruction incrémentale (voir pipeline.incremental) : une étape dont les entrées n'ont pas
+changé est sautée ; sinon seuls les groupes (indicateur, sous-indicateur) modifiés sont
+recalculés et remplacés dans les sorties existantes. Modifier un chiffre du CSV brut ne refait
+donc, étape après étape, que la série concernée.
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from datastore import refresh_columnar
+from forecasting.batch import (
+    DATA_DIR,
+    all_path,
+    forecast_domain,
+    forecast_path,
+    load_monthly,
+    merge_history,
+    monthly_path,
+    report_path,
+)
+from forecasting.deadline import BUDGET, FAILED, SERIES_TIMEOUT, TIMEOUT
+from forecasting.sarima import silence_statsmodels_warnings
+from forecasting.store import STORE_DIR
+from pipeline.annual import MERGE_COLUMNS, interpolate, with_crise
+from pipeline.config import DOMAIN_CONFIGS
+from pipeline.disaggregate import SITES
+from pipeline.incremental import (
+    BUILD_DIR,
+    combine_hashes,
+    file_hash,
+    group_hashes,
+    key_strings,
+    load_manifest,
+    params_hash,
+    save_manifest,
+    splice,
+    stale_groups,
+)
+from pipeline.ingest import load_raw, read_raw, report_invalid
+from pipeline.monthly import build_monthly
+
+
+STAGES = ("interpolated", "with-crise", "mensuelles", "forecast", "all")
+
+
+def raw_path(domain: str) -> str:
+    """CSV annuel brut d'un domaine (nombres au format français)."""
+    return os.path.join(DATA_DIR, domain, f"{domain}-data.csv")
+
+
+def interpolated_path(domain: str) -> str:
+    """CSV annuel interpolé (2011 -> année suivant la dernière observée)."""
+    return os.path.join(DATA_DIR, domain, f"{domain}-data-interpolated.csv")
+
+
+def crise_path(domain: str) -> str:
+    """CSV annuel de comparaison normal / crise."""
+    return os.path.join(DATA_DIR, domain, f"{domain}-data-with-crise.csv")
+
+
+# Colonnes de groupe des CSV annuels et des CSV mensuels
+ANNUAL_GROUPS = ["INDICATEUR", "SOUS-INDICATEUR"]
+MONTHLY_GROUPS = ["indicateur", "sous_indicateur"]
+
+# Prévisions de repli (délai dépassé, processus arrêté) : recalculées à la construction suivante
+RETRY_PATHS = (TIMEOUT, BUDGET, FAILED)
+
+# Une étape de la chaîne :
+# - load(domain, year, **options) -> DataFrames d'entrée
+# - outputs(domain, year) -> fichiers écrits
+# - compute(domain, frames, **options) -> un DataFrame par fichier de `outputs`
+# - order(config, frames, out) -> sortie remise dans l'ordre d'une reconstruction complète
+# - groups(config) -> (colonnes de groupe des entrées, colonnes de groupe des sorties)
+# - positional(config) -> le résultat dépend de la position des lignes d'entrée (graines par ligne)
+# - params(config, options) -> paramètres dont dépend le résultat
+# - retry(outs) -> groupes à recalculer à la construction suivante
+Stage = namedtuple("Stage", ["load", "outputs", "compute", "order", "groups", "positional", "params", "retry"],
+                   defaults=(lambda config: False, lambda config, options: None, lambda outs: set()))
+
+
+def _positions(frame: pd.DataFrame, columns: list, out: pd.DataFrame, out_columns: list) -> np.ndarray:
+    """Position, dans frame, de la première ligne de même clé que chaque ligne de out."""
+    first = pd.Series(np.arange(len(frame))).groupby(key_strings(frame, columns).to_numpy()).min()
+    return key_strings(out, out_columns).map(first).to_numpy()
+
+
+def _order_interpolated(config, frames, out):
+    return out.sort_values(["INDICATEUR", "SOUS-INDICATEUR", "ANNEE"], kind="stable")
+
+
+def _order_with_crise(config, frames, out):
+    return out.iloc[np.argsort(_positions(frames[0], MERGE_COLUMNS, out, MERGE_COLUMNS), kind="stable")]
+
+
+def _order_monthly(config, frames, out):
+    # Ligne annuelle, puis site, puis mois (ordre de annual_series) ; tri du groupby des notebooks en journalier
+    row = _positions(frames[0], ["ANNEE", *ANNUAL_GROUPS], out, ["year", *MONTHLY_GROUPS])
+    site = out["site_code"].map({s: i for i, s in enumerate(SITES)}).to_numpy()
+    out = out.iloc[np.lexsort((out["month"].to_numpy(), site, row))]
+    if config["monthly"] == "daily":
+        out = out.sort_values(["year", "month", "site_code", "indicateur", "sous_indicateur", "unite"], kind="stable")
+    return out
+
+
+def _order_forecast(config, frames, out):
+    # Séries dans leur ordre d'apparition dans le CSV mensuel (iter_series)
+    series = ["site_code", *MONTHLY_GROUPS]
+    return out.iloc[np.argsort(_positions(frames[0], series, out, series), kind="stable")]
+
+
+def _order_all(config, frames, out):
+    return out.sort_values(["site_code", "indicateur", "sous_indicateur", "year", "month"])
+
+
+def _compute_forecast(domain, frames, year=2017, method="auto", joint=True, forecast_workers=1, store_dir=STORE_DIR,
+                      series_timeout=SERIES_TIMEOUT, deadline=None, **_):
+    return forecast_domain(domain, year=year, workers=forecast_workers, store_dir=store_dir, method=method,
+                           series_timeout=series_timeout, deadline=deadline, joint=joint, df=frames[0])
+
+
+def _retry_forecast(outs):
+    report = outs[1]
+    return set(key_strings(report[report["path"].isin(RETRY_PATHS)], MONTHLY_GROUPS))
+
+
+STAGE_SPECS = {
+    "interpolated": Stage(
+        # CSV brut déjà converti par run (option raw), sinon lu ici
+        load=lambda domain, year, raw=None, **_: [load_raw(raw_path(domain)) if raw is None else raw],
+        outputs=lambda domain, year: [interpolated_path(domain)],
+        compute=lambda domain, frames, **_: [interpolate(frames[0])],
+        order=_order_interpolated,
+        groups=lambda config: (ANNUAL_GROUPS, ANNUAL_GROUPS),
+    ),
+    "with-crise": Stage(
+        load=lambda domain, year, **_: [pd.read_csv(interpolated_path(domain))],
+        outputs=lambda domain, year: [crise_path(domain)],
+        compute=lambda domain, frames, **_: [with_crise(frames[0], DOMAIN_CONFIGS[domain])],
+        order=_order_with_crise,
+        # Répartitions qualité dégradées par (année, indicateur) : le groupe est l'indicateur entier
+        groups=lambda config: (["INDICATEUR"], ["INDICATEUR"]) if "degradation" in config
+        else (ANNUAL_GROUPS, ANNUAL_GROUPS),
+        params=lambda config, options: {k: config.get(k) for k in ("crise_coef", "degradation")},
+    ),
+    "mensuelles": Stage(
+        load=lambda domain, year, **_: [pd.read_csv(interpolated_path(domain))],
+        outputs=lambda domain, year: [monthly_path(domain)],
+        compute=lambda domain, frames, **_: [build_monthly(frames[0], DOMAIN_CONFIGS[domain])],
+        order=_order_monthly,
+        groups=lambda config: (ANNUAL_GROUPS, MONTHLY_GROUPS),
+        positional=lambda config: config["monthly"] in ("hr", "quality"),
+        params=lambda config, options: {k: v for k, v in config.items() if k != "crise_coef"},
+    ),
+    "forecast": Stage(
+        load=lambda domain, year, **_: [load_monthly(monthly_path(domain))],
+        outputs=lambda domain, year: [forecast_path(domain, year), report_path(domain, year)],
+        compute=_compute_forecast,
+        order=_order_forecast,
+        groups=lambda config: (MONTHLY_GROUPS, MONTHLY_GROUPS),
+        params=lambda config, options: {"year": options.get("year"), "method": options.get("method", "auto"),
+                                        "joint": options.get("joint", True)},
+        retry=_retry_forecast,
+    ),
+    "all": Stage(
+        load=lambda domain, year, **_: [pd.read_csv(monthly_path(domain)), pd.read_csv(forecast_path(domain, year))],
+        outputs=lambda domain, year: [all_path(domain)],
+        compute=lambda domain, frames, **_: [merge_history(domain, frames[1], df_hist=frames[0])],
+        order=_order_all,
+        groups=lambda config: (MONTHLY_GROUPS, MONTHLY_GROUPS),
+        params=lambda config, options: {"year": options.get("year")},
+    ),
+}
+
+
+def build_stage(domain: str, name: str, manifest: dict, force: bool = False, year: int = 2017, **options) -> str:
+    """
+    Reconstruit une étape d'un domaine si elle est périmée, pour les seuls groupes dont les entrées
+    ont changé depuis la construction enregistrée dans le manifeste.
+
+    Tout est recalculé si les paramètres ont changé, si une sortie manque ou a été modifiée hors
+    de la chaîne, ou avec force.
+
+    Args:
+        domain: dossier de data/ (ex: "hr")
+        name: étape (voir STAGE_SPECS)
+        manifest: manifeste du domaine, mis à jour sur place
+        force: recalcule tous les groupes
+        year, options: paramètres de la prévision (voir run_domain)
+
+    Returns:
+        bilan : "complet", "<n> groupe(s)" ou "à jour"
+    """
+    spec = STAGE_SPECS[name]
+    config = DOMAIN_CONFIGS[domain]
+    frames = spec.load(domain, year, **options)
+    in_columns, out_columns = spec.groups(config)
+    hashes = combine_hashes([group_hashes(f, in_columns, spec.positional(config)) for f in frames])
+    outputs = spec.outputs(domain, year)
+    params = params_hash(spec.params(config, {"year": year, **options}))
+
+    entry = manifest.get(name, {})
+    recorded = entry.get("outputs", {})
+    up_to_date = (
+        not force
+        and entry.get("params") == params
+        and all(recorded.get(path) is not None and recorded.get(path) == file_hash(path) for path in outputs)
+    )
+    if up_to_date:
+        stale = stale_groups(entry.get("groups", {}), hashes)
+        if not stale:
+            return "à jour"
+        subset = [f[key_strings(f, in_columns).isin(stale)] for f in frames]
+        new_outs = spec.compute(domain, subset, year=year, **options) if any(len(f) for f in subset) else None
+        outs = []
+        for i, path in enumerate(outputs):
+            old = pd.read_csv(path)
+            new = new_outs[i] if new_outs is not None else old.iloc[:0]
+            outs.append(spec.order(config, frames, splice(old, new, out_columns, stale)))
+        status = f"{len(stale)} groupe(s)"
+    else:
+        outs = spec.compute(domain, frames, year=year, **options)
+        status = "complet"
+
+    for path, out in zip(outputs, outs):
+        out.to_csv(path, index=False)
+    # Parquet lu par le dashboard (le premier fichier ; pas le rapport de prévision)
+    refresh_columnar(outputs[0])
+    retry = spec.retry(outs)
+    manifest[name] = {
+        "params": params,
+        "outputs": {path: file_hash(path) for path in outputs},
+        "groups": {key: "" if key in retry else h for key, h in hashes.items()},
+    }
+    return status
+
+
+def run_domain(domain: str, stages=STAGES, force: bool = False, build_dir: str = BUILD_DIR, **options) -> list:
+    """
+    Exécute les étapes demandées d'un domaine, dans l'ordre de STAGES, en ne recalculant que
+    ce qui est périmé (voir build_stage).
+
+    Args:
+        domain: dossier de data/ (ex: "hr")
+        stages: étapes à exécuter
+        force: recalcule toutes les étapes demandées
+        build_dir: dossier des manifestes
+        options: CSV brut déjà converti (raw) et paramètres de la prévision (year, method, joint,
+            forecast_workers, store_dir, series_timeout, deadline)
+
+    Returns:
+        liste de (étape, bilan, durée en secondes)
+    """
+    silence_statsmodels_warnings()
+    manifest = load_manifest(domain, build_dir)
+    done = []
+    for stage in STAGES:
+        if stage in stages:
+            start = time.perf_counter()
+            status = build_stage(domain, stage, manifest, force=force, **options)
+            save_manifest(domain, manifest, build_dir)
+            done.append((stage, status, time.perf_counter() - start))
+    return done
+
+
+def _report(domain: str, done: list):
+    steps = ", ".join(f"{stage} {elapsed:.1f} s ({status})" for stage, status, elapsed in done)
+    print(f"{domain}: {steps}")
+
+
+def run(domains, stages=STAGES, workers: int = None, budget: float = None, **options) -> dict:
+    """
+    Exécute la chaîne de plusieurs domaines, un processus par domaine.
+
+    Args:
+        domains: domaines à reconstruire
+        stages: étapes à exécuter (voir STAGES)
+        workers: nombre de domaines traités en même temps (défaut : nombre de cœurs ; 1 = séquentiel)
+        budget: durée maximale des prévisions en secondes, pour l'ensemble des domaines
+        options: voir run_domain
+
+    Returns:
+        {domaine: liste de (étape, bilan, durée)} ; les domaines en échec sont absents
+    """
+    if budget:
+        options["deadline"] = time.monotonic() + budget
+    # CSV bruts de tous les domaines convertis en un seul passage, cellules invalides signalées ensemble
+    raws = {}
+    if "interpolated" in stages:
+        frames, invalid = read_raw([raw_path(d) for d in domains if os.path.exists(raw_path(d))])
+        report_invalid(invalid)
+        raws = {domain: frames.get(raw_path(domain)) for domain in domains}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(domains)))
+    start = time.perf_counter()
+    results = {}
+
+    if workers == 1:
+        outcomes = ((d, lambda d=d: run_domain(d, stages, raw=raws.get(d), **options)) for d in domains)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = {pool.submit(run_domain, domain, stages, raw=raws.get(domain), **options): domain
+                   for domain in domains}
+        outcomes = ((futures[f], f.result) for f in as_completed(futures))
+    try:
+        for domain, result in outcomes:
+            try:
+                results[domain] = result()
+            except Exception as exc:
+                print(f"{domain}: échec ({exc!r})")
+                continue
+            _report(domain, results[domain])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"{len(results)}/{len(domains)} domaine(s) en {time.perf_counter() - start:.1f} s")
+    return results
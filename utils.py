@@ -1,114 +1,408 @@
 # utils.py — fonctions partagées (chargement de données, etc.)
+import os
+import threading
+import warnings
+from collections import namedtuple
+
 import pandas as pd
 import streamlit as st
 import numpy as np
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 
+from datastore import columnar_path, load_manifest, read_dataset
+from forecasting.sarima import (
+    MIN_POINTS,
+    ORDER,
+    SEASONAL_ORDER,
+    fallback_seasonal_naive,
+    is_forecast_sane,
+    prepare_series,
+)
+
+# Les jeux de données et cubes sont partagés entre toutes les sessions (st.cache_resource) :
+# un appelant ne doit jamais modifier un objet renvoyé par le cache. Copy-on-Write ne protège
+# que les DataFrames dérivés (sélections, filtres) : df[col] = ... ou df.loc[...] = ... sur
+# l'objet mis en cache lui-même le modifierait pour toutes les sessions. load_data renvoie donc
+# une copie superficielle (colonnes partagées, sans recopie des données). Copy-on-Write est
+# toujours actif à partir de pandas 3.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def data_signature(path: str) -> tuple:
+    """
+    Signature (taille, mtime) du CSV et de son Parquet.
+
+    Sert de clé de cache : dès qu'un notebook ou datastore.py régénère l'un des deux
+    fichiers, la signature change et les données sont rechargées.
+    """
+    signature = []
+    for file_path in (path, columnar_path(path)):
+        try:
+            stat = os.stat(file_path)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
 
-@st.cache_data
 def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    if "ANNEE" in df.columns:
+    """
+    Jeu de données, une seule copie des valeurs en mémoire pour toutes les sessions.
+
+    La copie superficielle renvoyée partage les colonnes du cache : avec Copy-on-Write, une
+    affectation de colonne par l'appelant ne touche pas l'objet partagé.
+    """
+    return _load_data(path, data_signature(path)).copy(deep=False)
+
+
+@st.cache_resource
+def _load_data(path: str, signature: tuple) -> pd.DataFrame:
+    # Parquet (libellés en category, year/month typés) si présent, sinon CSV
+    df = read_dataset(path)
+    if "ANNEE" in df.columns and not pd.api.types.is_integer_dtype(df["ANNEE"]):
         df["ANNEE"] = df["ANNEE"].astype(int)
     return df
 
 
-@st.cache_data
-def generate_forecast_2017(
-    df: pd.DataFrame,
+# Colonnes identifiant une série (un graphique par série dans les pages)
+SERIES_KEYS = ["indicateur", "unite", "sous_indicateur"]
+
+# Mode affiché -> colonne de valeur
+MODE_COLUMNS = {"Normal": "value", "Crise": "value_crise"}
+
+# Position d'une série dans les tables du cube : offsets (début, fin) + années présentes
+SeriesPartition = namedtuple("SeriesPartition", ["monthly", "yearly", "years"])
+
+
+def partition_index(frame: pd.DataFrame, keys: list) -> dict:
+    """
+    Offsets des groupes d'un DataFrame trié sur `keys` : {clé: (début, fin)}.
+
+    Une seule passe (comparaison des lignes consécutives) ; frame.iloc[début:fin]
+    donne ensuite le groupe sans aucun masque booléen.
+    """
+    n = len(frame)
+    if n == 0:
+        return {}
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for key in keys:
+        col = frame[key]
+        values = col.cat.codes.to_numpy() if isinstance(col.dtype, pd.CategoricalDtype) else col.to_numpy()
+        change[1:] |= values[1:] != values[:-1]
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], n)
+    labels = zip(*(frame[key].to_numpy()[starts] for key in keys))
+    return {label: (int(a), int(b)) for label, a, b in zip(labels, starts, stops)}
+
+
+def _series_tree(monthly: pd.DataFrame, yearly: pd.DataFrame) -> dict:
+    """{indicateur: {unite: {sous_indicateur: SeriesPartition}}} dans l'ordre trié du cube."""
+    monthly_index = partition_index(monthly, SERIES_KEYS)
+    yearly_index = partition_index(yearly, SERIES_KEYS)
+    year_values = yearly["year"].to_numpy()
+    tree = {}
+    for (indic, unite, sous), bounds in monthly_index.items():
+        y0, y1 = yearly_index[(indic, unite, sous)]
+        years = frozenset(int(y) for y in year_values[y0:y1])
+        tree.setdefault(indic, {}).setdefault(unite, {})[sous] = SeriesPartition(bounds, (y0, y1), years)
+    return tree
+
+
+def build_cube(df: pd.DataFrame) -> dict:
+    """
+    Pré-agrège un jeu de données mensuel pour les pages.
+
+    Le cube est indexé par (site, mode) — site = PLF, CFX ou TOTAL (somme des sites),
+    mode = Normal ou Crise — et contient pour chacun :
+    - "monthly" : une ligne par (indicateur, unite, sous_indicateur, year, month)
+    - "yearly"  : une ligne par (indicateur, unite, sous_indicateur, year) pour le tableau détaillé
+    Les deux tables sont triées sur ces clés ; la colonne de valeur s'appelle toujours "value".
+    "index" donne, par site, la position de chaque série dans ces tables (voir partition_index).
+
+    Args:
+        df: DataFrame mensuel (colonnes year, month, site_code, indicateur, sous_indicateur, unite, value[, value_crise])
+
+    Returns:
+        dict avec les clés "monthly", "yearly" (dict (site, mode) -> DataFrame),
+        "index" (site -> arborescence des séries) et "years" (site -> années)
+    """
+    required_cols = {"site_code", "year", "month", *SERIES_KEYS, "value"}
+    if not required_cols.issubset(df.columns):
+        raise ValueError(
+            f"Le CSV ne contient pas les colonnes attendues ({', '.join(sorted(required_cols))})."
+        )
+
+    keys = SERIES_KEYS + ["year", "month"]
+    value_cols = [col for col in MODE_COLUMNS.values() if col in df.columns]
+    by_site = df.groupby(["site_code"] + keys, observed=True)[value_cols].sum().reset_index()
+    total = df.groupby(keys, observed=True)[value_cols].sum().reset_index()
+
+    parts = [(str(site), part) for site, part in by_site.groupby("site_code", observed=True)]
+    parts.append(("TOTAL", total))
+
+    cube = {"monthly": {}, "yearly": {}, "index": {}, "years": {}}
+    for site, part in parts:
+        cube["years"][site] = sorted(int(y) for y in part["year"].unique().tolist())
+        for mode, col in MODE_COLUMNS.items():
+            # Pas de colonne crise : le mode Crise affiche les valeurs normales (comme avant)
+            col = col if col in part.columns else "value"
+            monthly = part[keys].reset_index(drop=True)
+            monthly["value"] = part[col].to_numpy()
+            yearly = (
+                monthly
+                .groupby(SERIES_KEYS + ["year"], observed=True)["value"]
+                .sum()
+                .reset_index()
+            )
+            cube["monthly"][(site, mode)] = monthly
+            cube["yearly"][(site, mode)] = yearly
+        # Mêmes clés, même ordre pour les deux modes : un seul index par site
+        cube["index"][site] = _series_tree(monthly, yearly)
+    return cube
+
+
+def load_cube(path: str) -> dict:
+    """Cube pré-agrégé d'un jeu de données (voir build_cube), calculé une fois par fichier et partagé (lecture seule)."""
+    return _load_cube(path, data_signature(path))
+
+
+@st.cache_resource
+def _load_cube(path: str, signature: tuple) -> dict:
+    return build_cube(_load_data(path, signature))
+
+
+@st.cache_resource
+def _watched_signatures() -> dict:
+    """Dernière signature vue par fichier, partagée entre les sessions."""
+    return {"lock": threading.Lock(), "signatures": {}}
+
+
+def refresh_changed_data(paths) -> list:
+    """
+    Surveille les fichiers de données (appelée à chaque exécution de l'app, quelques stat()).
+
+    Pour chaque fichier dont la signature a changé depuis le dernier passage, supprime
+    les entrées de cache de l'ancienne version puis recharge données + cube ; les autres
+    domaines restent en cache. Retourne les chemins rechargés.
+    """
+    watched = _watched_signatures()
+    changed = []
+    with watched["lock"]:
+        for path in paths:
+            if not path:
+                continue
+            signature = data_signature(path)
+            previous = watched["signatures"].get(path)
+            watched["signatures"][path] = signature
+            if previous is None or previous == signature:
+                continue
+            _load_cube.clear(path, previous)
+            _load_data.clear(path, previous)
+            changed.append(path)
+    for path in changed:
+        load_cube(path)
+    return changed
+
+
+def cube_lookup(cube: dict, site: str, mode: str):
+    """Tables (mensuelle, annuelle) d'un site et d'un mode ; tables vides si absentes."""
+    key = (site, mode)
+    if key not in cube["monthly"]:
+        empty = pd.DataFrame(columns=SERIES_KEYS + ["year", "month", "value"])
+        return empty, empty.drop(columns=["month"])
+    return cube["monthly"][key], cube["yearly"][key]
+
+
+def filter_years(years: list, year_choice, show_forecast: bool) -> list:
+    """Années affichées : filtre année de la sidebar ; 2017 (prévision) seulement si demandée."""
+    return [
+        y for y in years
+        if (year_choice == "Toutes" or y == int(year_choice)) and (show_forecast or y != 2017)
+    ]
+
+
+def visible_series(cube: dict, site: str, years: list) -> dict:
+    """Arborescence des séries d'un site (voir build_cube) limitée à celles ayant des données sur `years`."""
+    years = set(years)
+    tree = {}
+    for indic, unites in cube["index"].get(site, {}).items():
+        for unite, sous_parts in unites.items():
+            for sous, part in sous_parts.items():
+                if part.years & years:
+                    tree.setdefault(indic, {}).setdefault(unite, {})[sous] = part
+    return tree
+
+
+def series_frame(table: pd.DataFrame, bounds: tuple, years: list) -> pd.DataFrame:
+    """Lignes [début, fin) d'une table du cube, restreintes aux années affichées."""
+    part = table.iloc[bounds[0]:bounds[1]]
+    mask = part["year"].isin(years)
+    return part if mask.all() else part[mask]
+
+
+def unit_frame(monthly: pd.DataFrame, sous_parts: dict, years: list) -> pd.DataFrame:
+    """Lignes mensuelles de tous les sous-indicateurs d'une (indicateur, unite) : contiguës dans le cube."""
+    parts = list(sous_parts.values())
+    return series_frame(monthly, (parts[0].monthly[0], parts[-1].monthly[1]), years)
+
+
+def chart_frame(frame: pd.DataFrame, fields: list) -> pd.DataFrame:
+    """
+    Données compactes pour un graphique Altair.
+
+    Streamlit envoie les données des graphiques en Arrow : on ne garde que les colonnes
+    encodées, un index simple (non sérialisé) et, pour les libellés, les seules modalités
+    présentes (sinon tout le dictionnaire du jeu de données part avec chaque graphique).
+    Les agrégations sont déjà faites dans le cube : le spec ne contient aucune transformation.
+    """
+    data = frame[fields].reset_index(drop=True)
+    for col in fields:
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            data[col] = data[col].cat.remove_unused_categories()
+    return data
+
+
+def indicator_table(yearly: pd.DataFrame, unites: dict, years: list) -> pd.DataFrame:
+    """Cumuls annuels d'un indicateur : ses séries sont contiguës dans la table annuelle."""
+    parts = [part for sous_parts in unites.values() for part in sous_parts.values()]
+    return series_frame(yearly, (parts[0].yearly[0], parts[-1].yearly[1]), years)
+
+
+# Nombre de lignes envoyées par page du tableau détaillé
+DETAIL_PAGE_SIZE = 500
+
+
+def page_count(n_rows: int, page_size: int = DETAIL_PAGE_SIZE) -> int:
+    """Nombre de pages d'un tableau (au moins 1)."""
+    return max(1, -(-n_rows // page_size))
+
+
+def table_page(table: pd.DataFrame, page: int, page_size: int = DETAIL_PAGE_SIZE) -> pd.DataFrame:
+    """Lignes de la page `page` (numérotée à partir de 1) : seule cette page est sérialisée."""
+    start = (int(page) - 1) * page_size
+    return table.iloc[start:start + page_size]
+
+
+# --- Prévisions à la demande ---
+
+# Nombre de prévisions gardées en cache (toutes sessions confondues)
+FORECAST_CACHE_ENTRIES = 512
+
+
+def dataset_fingerprint(path: str) -> str:
+    """Empreinte du contenu d'un jeu de données (lue dans son manifeste, sans charger les données)."""
+    return load_manifest(path)["fingerprint"]
+
+
+def forecast_monthly(
+    path: str,
     site_code: str,
     indicateur: str,
     sous_indicateur: str,
     value_col: str = "value",
+    horizon: int = 12,
+    history_end: int = 2016,
 ) -> pd.DataFrame:
     """
-    Génère des prédictions pour l'année 2017 en utilisant SARIMAX.
-    
+    Prévision SARIMA mensuelle d'une série, calculée à la demande et partagée entre les sessions.
+
+    Le cache est indexé par (empreinte du jeu de données, site, indicateur, sous-indicateur,
+    colonne, horizon) : aucun DataFrame n'est haché, et la prévision est recalculée seulement
+    quand le fichier change.
+
     Args:
-        df: DataFrame avec les données historiques
+        path: chemin du CSV du domaine (ex: data/hr/hr-all.csv)
         site_code: Code du site (PLF, CFX, ou TOTAL)
         indicateur: Nom de l'indicateur
         sous_indicateur: Nom du sous-indicateur
-        value_col: Nom de la colonne de valeur
-        
+        value_col: "value" ou "value_crise"
+        horizon: nombre de mois à prévoir à partir de janvier de history_end + 1
+        history_end: dernière année d'historique utilisée pour l'ajustement
+
     Returns:
-        DataFrame avec les prédictions pour 2017 (date, year, month, value)
+        DataFrame (date, year, month, value, lower, upper, site_code, indicateur, sous_indicateur),
+        vide si la série est introuvable ou trop courte
     """
+    return _forecast_monthly(
+        dataset_fingerprint(path), path, site_code, indicateur, sous_indicateur, value_col, horizon, history_end
+    )
+
+
+@st.cache_data(max_entries=FORECAST_CACHE_ENTRIES, show_spinner=False)
+def _forecast_monthly(
+    fingerprint: str,
+    path: str,
+    site_code: str,
+    indicateur: str,
+    sous_indicateur: str,
+    value_col: str,
+    horizon: int,
+    history_end: int,
+) -> pd.DataFrame:
+    mode = {col: name for name, col in MODE_COLUMNS.items()}.get(value_col)
+    cube = load_cube(path)
+    if mode is None or site_code not in cube["index"]:
+        return pd.DataFrame()
+    monthly, _ = cube_lookup(cube, site_code, mode)
+
+    # Position de la série dans le cube (le sous-indicateur est rangé sous son unité)
+    unites = cube["index"][site_code].get(indicateur, {})
+    part = next((sous_parts[sous_indicateur] for sous_parts in unites.values() if sous_indicateur in sous_parts), None)
+    if part is None:
+        return pd.DataFrame()
+    hist = monthly.iloc[part.monthly[0]:part.monthly[1]]
+    hist = hist[hist["year"] <= history_end]
+    if len(hist) < MIN_POINTS:
+        return pd.DataFrame()
+
+    dates = pd.to_datetime(pd.DataFrame({"year": hist["year"], "month": hist["month"], "day": 1}))
+    ts = prepare_series(pd.Series(hist["value"].to_numpy(dtype="float64"), index=dates.to_numpy()))
+    # Les mois prévus commencent en janvier de history_end + 1, même si la série s'arrête avant
+    future = pd.date_range(f"{history_end + 1}-01-01", periods=horizon, freq="MS")
+    steps = (pd.Period(future[-1], "M") - pd.Period(ts.index.max(), "M")).n
+
     try:
-        # Filtrer les données historiques (jusqu'à 2016)
-        df_filtered = df[
-            (df["indicateur"] == indicateur) &
-            (df["sous_indicateur"] == sous_indicateur)
-        ].copy()
-        
-        # Gérer le filtre site_code
-        if site_code in ("PLF", "CFX"):
-            df_filtered = df_filtered[df_filtered["site_code"] == site_code]
-        elif site_code == "TOTAL":
-            # Pour TOTAL, on agrège PLF + CFX par date
-            if "date" in df_filtered.columns:
-                df_filtered = (
-                    df_filtered.groupby("date")[value_col]
-                    .sum()
-                    .reset_index()
-                )
-                df_filtered["site_code"] = "TOTAL"
-            else:
-                return pd.DataFrame()
-        
-        # S'assurer qu'on a la colonne date
-        if "date" not in df_filtered.columns:
-            return pd.DataFrame()
-        
-        df_filtered["date"] = pd.to_datetime(df_filtered["date"])
-        
-        # Filtrer jusqu'à 2016 inclus
-        year_col = "ANNEE" if "ANNEE" in df_filtered.columns else "year"
-        if year_col in df_filtered.columns:
-            df_filtered = df_filtered[df_filtered[year_col] <= 2016]
-        else:
-            df_filtered = df_filtered[df_filtered["date"].dt.year <= 2016]
-        
-        if len(df_filtered) < 100:  # Pas assez de données pour entraîner
-            return pd.DataFrame()
-        
-        # Créer une série temporelle journalière
-        df_filtered = df_filtered.sort_values("date")
-        ts = df_filtered.set_index("date")[value_col].asfreq("D")
-        
-        # Remplir les valeurs manquantes (forward fill)
-        ts = ts.fillna(method="ffill").fillna(method="bfill")
-        
-        if len(ts) < 100 or ts.isna().all():
-            return pd.DataFrame()
-        
-        # Entraîner le modèle SARIMAX
         model = SARIMAX(
             ts,
-            order=(1, 1, 1),  # tendance
-            seasonal_order=(1, 1, 1, 7)  # saison hebdomadaire
+            order=ORDER,
+            seasonal_order=SEASONAL_ORDER,
+            enforce_stationarity=False,
+            enforce_invertibility=False,
         )
-        
-        results = model.fit(disp=False)
-        
-        # Générer les prédictions pour 2017 (365 jours)
-        forecast_2017 = results.get_forecast(steps=365)
-        pred_2017 = forecast_2017.predicted_mean
-        
-        # Créer un DataFrame avec les prédictions
-        dates_2017 = pd.date_range("2017-01-01", "2017-12-31", freq="D")
-        df_forecast = pd.DataFrame({
-            "date": dates_2017,
-            "year": 2017,
-            "month": dates_2017.month,
-            "value": pred_2017.values,
-            "indicateur": indicateur,
-            "sous_indicateur": sous_indicateur,
-            "site_code": site_code if site_code != "TOTAL" else "PLF",  # Pour compatibilité
-        })
-        
-        return df_forecast
-        
-    except Exception as e:
-        # En cas d'erreur, retourner un DataFrame vide
-        return pd.DataFrame()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fc = model.fit(disp=False).get_forecast(steps=steps)
+        pred = fc.predicted_mean.iloc[-horizon:]
+        conf = fc.conf_int().to_numpy()[-horizon:]
+        if not is_forecast_sane(pred):
+            raise ValueError("prévision explosive")
+        lower, upper = conf[:, 0], conf[:, 1]
+    except Exception:
+        # Ajustement impossible ou instable : moyenne des mêmes mois de l'historique
+        pred = fallback_seasonal_naive(ts, future[0], future[-1])
+        lower = upper = pred.to_numpy()
+
+    return pd.DataFrame({
+        "date": future,
+        "year": future.year,
+        "month": future.month,
+        "value": np.asarray(pred, dtype="float64"),
+        "lower": lower,
+        "upper": upper,
+        "site_code": site_code,
+        "indicateur": indicateur,
+        "sous_indicateur": sous_indicateur,
+    })
+
+
+def generate_forecast_2017(
+    path: str,
+    site_code: str,
+    indicateur: str,
+    sous_indicateur: str,
+    value_col: str = "value",
+) -> pd.DataFrame:
+    """Prévision mensuelle de 2017 à partir de l'historique 2011-2016 (voir forecast_monthly)."""
+    return forecast_monthly(path, site_code, indicateur, sous_indicateur, value_col, horizon=12, history_end=2016)